@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de VectorVisualizer
+
+Compara memoria y rendimiento de las clases Vector2D/Vector3D actuales
+(con __slots__ y magnitudes en caché) contra la implementación original
+basada en __dict__ y escalares de NumPy, el tiempo de generar una misma figura
+TikZ con TikZEmitter frente a la concatenación original con ``code +=``,
+el tamaño de una misma figura, el tiempo de generarla y (si hay pdflatex)
+el de compilarla con coordenadas a 4 cifras significativas frente a
+``repr``, y los k valores propios dominantes de matrices simétricas con
+``eigenpairs`` frente a ``eigh`` y ``eig``, con espectros con y sin
+separación.
+
+USO:
+    python benchmark_vectores.py            # 1 000 000 de instancias
+    python benchmark_vectores.py -n 100000
+    python benchmark_vectores.py --max-vectores 1000000
+    python benchmark_vectores.py --dim-matriz 3000
+"""
+
+import argparse
+import gc
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from latex_build import compile_tex, write_tex
+from vector_linalg import eigenpairs
+from tikz_emitter import TikZEmitter, format_points
+from vector_visualizer import Vector2D, Vector3D
+
+
+class LegacyVector2D:
+    """Vector2D original (v1.0), conservado solo como referencia"""
+
+    def __init__(self, x, y, name="v"):
+        self.x = float(x)
+        self.y = float(y)
+        self.name = name
+
+    def magnitude(self):
+        return np.sqrt(self.x**2 + self.y**2)
+
+    def angle(self):
+        return np.degrees(np.arctan2(self.y, self.x))
+
+
+class LegacyVector3D:
+    """Vector3D original (v1.0), conservado solo como referencia"""
+
+    def __init__(self, x, y, z, name="w"):
+        self.x = float(x)
+        self.y = float(y)
+        self.z = float(z)
+        self.name = name
+
+    def magnitude(self):
+        return np.sqrt(self.x**2 + self.y**2 + self.z**2)
+
+
+def legacy_plot_2d(vectors, labels, colors, show_grid):
+    """VectorSpace3D._generate_2d_plot original (v1.0), con ``code +=``"""
+    max_val = max(max(abs(v[0]), abs(v[1])) for v in vectors) * 1.2
+
+    code = r"\begin{center}" + "\n"
+    code += r"\begin{tikzpicture}[scale=1.5]" + "\n"
+    code += f"    \\draw[->] ({-max_val},0) -- ({max_val},0) node[right] {{$x$}};\n"
+    code += f"    \\draw[->] (0,{-max_val}) -- (0,{max_val}) node[above] {{$y$}};\n"
+    if show_grid:
+        code += f"    \\draw[gray!30, very thin] ({-max_val},{-max_val}) grid ({max_val},{max_val});\n"
+    for i, (vec, label, color) in enumerate(zip(vectors, labels, colors)):
+        code += f"    \\draw[->, thick, {color}!80] (0,0) -- ({vec[0]},{vec[1]}) "
+        code += f"node[midway, above left] {{$\\vect{{{label}}}$}};\n"
+        code += f"    \\fill[{color}] ({vec[0]},{vec[1]}) circle (2pt);\n"
+    code += r"\end{tikzpicture}" + "\n"
+    code += r"\end{center}" + "\n"
+    return code
+
+
+def emitter_plot_2d(vectors, labels, colors, show_grid):
+    """
+    La misma figura que ``legacy_plot_2d``, escrita con TikZEmitter
+
+    Un \\draw y un \\fill por vector, sin \\foreach ni colocación de
+    etiquetas y con las coordenadas en ``repr``: solo cambia cómo se
+    acumula el código.
+    """
+    max_val = max(max(abs(v[0]), abs(v[1])) for v in vectors) * 1.2
+
+    tikz = TikZEmitter()
+    tikz.begin('center')
+    tikz.begin('tikzpicture', 'scale=1.5')
+    tikz.draw('->', f"({-max_val},0) -- ({max_val},0) node[right] {{$x$}}")
+    tikz.draw('->', f"(0,{-max_val}) -- (0,{max_val}) node[above] {{$y$}}")
+    if show_grid:
+        tikz.draw('gray!30, very thin', f"({-max_val},{-max_val}) grid ({max_val},{max_val})")
+    for vec, label, color in zip(vectors, labels, colors):
+        end = f"({vec[0]},{vec[1]})"
+        tikz.draw(f'->, thick, {color}!80',
+                  f"(0,0) -- {end} node[midway, above left] {{$\\vect{{{label}}}$}}")
+        tikz.fill(color, f"{end} circle (2pt)")
+    tikz.end('tikzpicture')
+    tikz.end('center')
+    return tikz.getvalue()
+
+
+def medir_memoria(fabrica, n):
+    """Bytes por instancia al mantener vivas n instancias"""
+    gc.collect()
+    tracemalloc.start()
+    objetos = [fabrica(i) for i in range(n)]
+    actual, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objetos
+    return actual / n
+
+
+def medir_tiempo(funcion, repeticiones=3):
+    """Mejor tiempo de varias repeticiones (segundos)"""
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def benchmark_clases(n):
+    """Tabla comparativa: memoria, creación y magnitud/ángulo (dos llamadas)"""
+    casos = [
+        ("Vector2D", LegacyVector2D, Vector2D, lambda c: (lambda i: c(i, i + 1.0))),
+        ("Vector3D", LegacyVector3D, Vector3D, lambda c: (lambda i: c(i, i + 1.0, 2.0))),
+    ]
+
+    filas = []
+    for nombre, legacy, actual, fabrica in casos:
+        for etiqueta, clase in (("original", legacy), ("actual", actual)):
+            crear = fabrica(clase)
+            memoria = medir_memoria(crear, n)
+            objetos = [crear(i) for i in range(n)]
+
+            t_crear = medir_tiempo(lambda: [crear(i) for i in range(n)])
+
+            if hasattr(clase, 'angle'):
+                def derivadas():
+                    for v in objetos:
+                        v.magnitude(); v.angle()
+                        v.magnitude(); v.angle()
+            else:
+                def derivadas():
+                    for v in objetos:
+                        v.magnitude(); v.magnitude()
+
+            t_derivadas = medir_tiempo(derivadas)
+            filas.append((nombre, etiqueta, memoria, t_crear, t_derivadas))
+            del objetos
+
+    print(f"{'Clase':<10} {'Versión':<9} {'B/inst':>8} {'Crear (s)':>10} {'Derivadas (s)':>14}")
+    for nombre, etiqueta, memoria, t_crear, t_derivadas in filas:
+        print(f"{nombre:<10} {etiqueta:<9} {memoria:>8.1f} {t_crear:>10.3f} {t_derivadas:>14.3f}")
+
+
+def benchmark_figuras(max_vectores):
+    """Tiempo de generar la misma figura 2D con ``code +=`` y con TikZEmitter"""
+    rng = np.random.default_rng(0)
+
+    print(f"{'Vectores':>9} {'Original (s)':>13} {'Emitter (s)':>12} {'µs/vector':>10}")
+    n = 1000
+    while n <= max_vectores:
+        vectors = [tuple(v) for v in rng.uniform(-5, 5, (n, 2)).tolist()]
+        labels = [f'v_{{{i+1}}}' for i in range(n)]
+        colors = ['blue'] * n
+        t_original = medir_tiempo(lambda: legacy_plot_2d(vectors, labels, colors, True))
+        t_emitter = medir_tiempo(lambda: emitter_plot_2d(vectors, labels, colors, True))
+        print(f"{n:>9,} {t_original:>13.3f} {t_emitter:>12.3f} {t_emitter / n * 1e6:>10.2f}")
+        n *= 10
+
+
+def _tiempo_compilacion(figura):
+    """Segundos de pdflatex para un documento con ``figura``; None sin LaTeX"""
+    if shutil.which('pdflatex') is None:
+        return None
+    tex = ("\\documentclass{article}\n\\usepackage{tikz}\n"
+           "\\newcommand{\\vect}[1]{\\mathbf{#1}}\n"
+           "\\begin{document}\n" + figura + "\\end{document}\n")
+    with tempfile.TemporaryDirectory() as tmp:
+        filepath = os.path.join(tmp, 'figura')
+        write_tex(tex, filepath)
+        return medir_tiempo(lambda: compile_tex(filepath, 'pdflatex'), repeticiones=1)
+
+
+def coordenadas_repr(points):
+    """Coordenadas TikZ con ``repr`` de cada componente, como el código original"""
+    return [f"({x!r},{y!r})" for x, y in points.tolist()]
+
+
+def figura_formato(points, labels, coordenadas):
+    """
+    Figura 2D de un \\draw, un \\fill y un \\node por vector con TikZEmitter
+
+    Solo cambia ``coordenadas`` (la función que escribe los puntos), así que
+    la diferencia de tamaño y de compilación se debe solo al formato.
+    """
+    ends = coordenadas(points)
+    middles = coordenadas(points / 2)
+    tikz = TikZEmitter()
+    tikz.begin('tikzpicture', 'scale=1.5')
+    for end, middle, label in zip(ends, middles, labels):
+        tikz.draw('->, thick, blue!80', f"(0,0) -- {end}")
+        tikz.fill('blue', f"{end} circle (2pt)")
+        tikz.node('blue!80, above left', middle, f"$\\vect{{{label}}}$")
+    tikz.end('tikzpicture')
+    return tikz.getvalue()
+
+
+def benchmark_formato(n):
+    """Figura de n vectores unitarios: coordenadas con repr vs 4 cifras significativas"""
+    rng = np.random.default_rng(0)
+    points = rng.normal(size=(n, 2))
+    points /= np.linalg.norm(points, axis=1)[:, None]
+    labels = [f'v_{{{i+1}}}' for i in range(n)]
+
+    print(f"{'Coordenadas':<14} {'Tamaño (KB)':>12} {'Generar (s)':>12} {'pdflatex (s)':>13}")
+    for nombre, coordenadas in (("repr", coordenadas_repr), ("4 cifras", format_points)):
+        figura = figura_formato(points, labels, coordenadas)
+        t_generar = medir_tiempo(lambda: figura_formato(points, labels, coordenadas))
+        segundos = _tiempo_compilacion(figura)
+        compilacion = f"{segundos:>13.2f}" if segundos is not None else f"{'-':>13}"
+        print(f"{nombre:<14} {len(figura.encode()) / 1024:>12.1f} {t_generar:>12.3f} {compilacion}")
+    if shutil.which('pdflatex') is None:
+        print("(sin pdflatex: no se mide el tiempo de compilación)")
+
+
+def matrices_simetricas(n, seed=0):
+    """Matrices (n, n) de prueba: (nombre, matriz) con y sin separación espectral"""
+    rng = np.random.default_rng(seed)
+    m = 2 * n
+    senal = rng.normal(size=(m, 10)) @ rng.normal(size=(10, n))
+    for ruido in (3, 10):
+        datos = senal + ruido * rng.normal(size=(m, n))
+        yield f"rango 10 + ruido {ruido}", datos.T @ datos / m
+    q, _ = np.linalg.qr(rng.normal(size=(n, n)))
+    yield "decaimiento 0.8^i", (q * (100 * 0.8 ** np.arange(n))) @ q.T
+    yield "np.cov de ruido", np.cov(rng.normal(size=(n, m)))
+    enteros = rng.integers(-5, 6, (n, n))
+    yield "enteros simétrica", enteros + enteros.T
+
+
+def benchmark_autovalores(n, k=3):
+    """Segundos para los k valores propios dominantes de matrices simétricas (n, n)"""
+    print(f"{'Matriz':<22} {'eigenpairs (s)':>15} {'eigh (s)':>9} {'eig (s)':>8} {'Error rel.':>11}")
+    for nombre, matriz in matrices_simetricas(n):
+        t_pares = medir_tiempo(lambda: eigenpairs(matriz, k), repeticiones=1)
+        t_eigh = medir_tiempo(lambda: np.linalg.eigh(matriz), repeticiones=1)
+        t_eig = medir_tiempo(lambda: np.linalg.eig(matriz), repeticiones=1)
+        referencia = np.linalg.eigvalsh(matriz)
+        referencia = referencia[np.argsort(-np.abs(referencia), kind='stable')[:k]]
+        error = np.abs(eigenpairs(matriz, k)[0] - referencia).max() / abs(referencia[0])
+        print(f"{nombre:<22} {t_pares:>15.2f} {t_eigh:>9.2f} {t_eig:>8.2f} {error:>11.1e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-n', type=int, default=1_000_000, help="número de instancias")
+    parser.add_argument('--max-vectores', type=int, default=100_000,
+                        help="vectores por figura en el caso más grande")
+    parser.add_argument('--dim-matriz', type=int, default=1500,
+                        help="dimensión de las matrices del benchmark de valores propios")
+    args = parser.parse_args()
+
+    print(f"Benchmark con n = {args.n:,}")
+    print()
+    benchmark_clases(args.n)
+    print()
+    benchmark_figuras(args.max_vectores)
+    print()
+    benchmark_formato(min(args.max_vectores, 10_000))
+    print()
+    benchmark_autovalores(args.dim_matriz)
+
+
+if __name__ == "__main__":
+    main()
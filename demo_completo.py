@@ -16,19 +16,30 @@ from pylatex import Document, Section, Subsection, Package, NoEscape, Math
 from pylatex.utils import bold
 import sys
 
+from label_placement import draw_labels
+from latex_build import build_document, write_tex
+from scene_bounds import SceneBounds
+from tikz_emitter import (DEFAULT_PALETTE, StyleRegistry, TikZEmitter, colormap,
+                          format_number, format_points, point)
+from view3d import View3D, painter_order
+
 class VectorSpace3DComplete:
     """Sistema completo con todas las funcionalidades"""
     
-    def __init__(self, title="Análisis Completo de Vectores"):
+    # Las figuras 3D se pintan de atrás hacia adelante
+    depth_sort = True
+    
+    def __init__(self, title="Análisis Completo de Vectores", project_3d=False):
         self.doc = Document(documentclass='article')
         self.title = title
+        self.project_3d = project_3d  # proyectar las figuras 3D en Python
         self._setup_document()
         
     def _setup_document(self):
         """Configura paquetes LaTeX"""
         # Paquetes esenciales
         packages = [
-            'tikz', 'tikz-3dplot', 'amsmath', 'amssymb',
+            'tikz', NoEscape('tikz-3dplot'), 'amsmath', 'amssymb',
             ('geometry', 'margin=2.5cm'), 'xcolor', 'pgfplots',
             'graphicx', 'float', 'hyperref'
         ]
@@ -105,93 +116,133 @@ class VectorSpace3DComplete:
     def visualize_2d_vectors(self, vectors, labels, colors=None):
         """Visualización mejorada de vectores 2D"""
         if colors is None:
-            colors = ['blue', 'red', 'green', 'orange', 'purple']
+            colors = list(DEFAULT_PALETTE)
         
-        max_val = max(max(abs(v[0]), abs(v[1])) for v in vectors) * 1.3
+        bounds = SceneBounds.from_vectors(vectors, 2, margin=1.3)
+        max_val = bounds.limit
+        scale = bounds.fit_scale(2)
         
-        code = r"\begin{figure}[H]" + "\n"
-        code += r"\centering" + "\n"
-        code += r"\begin{tikzpicture}[scale=2]" + "\n"
+        tikz = TikZEmitter()
+        tikz.begin('figure', 'H')
+        tikz.command('centering')
+        tikz.begin('tikzpicture', f'scale={format_number(scale)}')
         
         # Ejes con etiquetas
-        code += f"    \\draw[->] ({-max_val},0) -- ({max_val},0) node[right] {{$x$}};\n"
-        code += f"    \\draw[->] (0,{-max_val}) -- (0,{max_val}) node[above] {{$y$}};\n"
+        tikz.draw('->', f"{point(-max_val, 0)} -- {point(max_val, 0)} node[right] {{$x$}}")
+        tikz.draw('->', f"{point(0, -max_val)} -- {point(0, max_val)} node[above] {{$y$}}")
         
         # Grid
-        code += f"    \\draw[gray!20, very thin] ({-max_val},{-max_val}) grid ({max_val},{max_val});\n"
+        tikz.draw(bounds.grid_options('gray!20, very thin'),
+                  f"{point(-max_val, -max_val)} grid {point(max_val, max_val)}")
         
         # Círculo unitario
-        code += "    \\draw[gray!30, dashed] (0,0) circle (1);\n"
+        tikz.draw('gray!30, dashed', f"(0,0) circle ({format_number(1 / bounds.unit)})")
+        
+        # Coordenadas de todos los vectores, formateadas de una vez
+        points = bounds.coordinates(vectors)[:, :2]
+        angle = np.arctan2(points[:, 1], points[:, 0])
+        offset = 0.3 * np.column_stack([np.cos(angle), np.sin(angle)])
+        ends = format_points(points)
+        feet = format_points(points * (1, 0))
         
         # Vectores
-        for vec, label, color in zip(vectors, labels, colors):
+        colors = colormap(len(points), colors)
+        styles = StyleRegistry.for_colors(colors)
+        layer = TikZEmitter()
+        drawn = list(zip(ends, feet, labels, colors))
+        for end, foot, label, color in drawn:
             # Vector
-            code += f"    \\draw[-{{Stealth[length=3mm]}}, ultra thick, {color}] "
-            code += f"(0,0) -- ({vec[0]},{vec[1]});\n"
-            
-            # Etiqueta
-            angle = np.arctan2(vec[1], vec[0])
-            offset_x = 0.3 * np.cos(angle)
-            offset_y = 0.3 * np.sin(angle)
-            code += f"    \\node[{color}!80] at ({vec[0]+offset_x},{vec[1]+offset_y}) "
-            code += f"{{$\\vect{{{label}}}$}};\n"
+            layer.draw(styles(f'-{{Stealth[length=3mm]}}, ultra thick, {color}'), f"(0,0) -- {end}")
             
             # Punto final
-            code += f"    \\fill[{color}] ({vec[0]},{vec[1]}) circle (1.5pt);\n"
+            layer.fill(styles(color), f"{end} circle (1.5pt)")
             
             # Componentes (líneas punteadas)
-            code += f"    \\draw[{color}!30, densely dotted] (0,0) -- ({vec[0]},0) -- ({vec[0]},{vec[1]});\n"
+            layer.draw(styles(f'{color}!30, densely dotted'), f"(0,0) -- {foot} -- {end}")
         
-        code += r"\end{tikzpicture}" + "\n"
-        code += r"\caption{Visualización de vectores en $\R^2$}" + "\n"
-        code += r"\end{figure}" + "\n"
+        # Etiquetas: en la prolongación del vector si hay sitio, si no
+        # alrededor del extremo sin solaparse
+        n = len(drawn)
+        draw_labels(layer, points[:n], [f"$\\vect{{{label}}}$" for _, _, label, _ in drawn],
+                    [styles(f'{color}!80') for _, _, _, color in drawn], scale=scale,
+                    preferred=points[:n] + offset[:n])
+        styles.emit(tikz)
+        tikz.extend(layer)
         
-        return code
+        tikz.end('tikzpicture')
+        tikz.command('caption', r'Visualización de vectores en $\R^2$')
+        tikz.end('figure')
+        
+        return tikz.getvalue()
     
     def visualize_3d_vectors(self, vectors, labels, colors=None, theta=70, phi=120):
         """Visualización mejorada de vectores 3D"""
         if colors is None:
-            colors = ['blue', 'red', 'green', 'orange', 'purple']
+            colors = list(DEFAULT_PALETTE)
         
-        max_val = max(max(abs(v[0]), abs(v[1]), abs(v[2])) for v in vectors) * 1.2
+        bounds = SceneBounds.from_vectors(vectors, 3, margin=1.2)
+        max_val = bounds.limit
+        view = View3D((theta, phi), self.project_3d)
+        origin = view.origin
         
-        code = r"\begin{figure}[H]" + "\n"
-        code += r"\centering" + "\n"
-        code += f"\\tdplotsetmaincoords{{{theta}}}{{{phi}}}\n"
-        code += r"\begin{tikzpicture}[tdplot_main_coords, scale=1.5]" + "\n"
+        tikz = TikZEmitter()
+        tikz.begin('figure', 'H')
+        tikz.command('centering')
+        view.begin(tikz, f'scale={format_number(bounds.fit_scale(1.5))}')
         
         # Planos de referencia
-        code += "    \\draw[gray!10, fill=gray!5] "
-        code += f"(0,0,0) -- ({max_val},0,0) -- ({max_val},{max_val},0) -- (0,{max_val},0) -- cycle;\n"
+        x_end, xy_end, y_end, z_end = view.points(
+            [(max_val, 0, 0), (max_val, max_val, 0), (0, max_val, 0), (0, 0, max_val)])
+        tikz.draw('gray!10, fill=gray!5', f"{origin} -- {x_end} -- {xy_end} -- {y_end} -- cycle")
         
         # Ejes
-        code += f"    \\draw[-{{Stealth[length=2mm]}}, thick] (0,0,0) -- ({max_val},0,0) node[right] {{$x$}};\n"
-        code += f"    \\draw[-{{Stealth[length=2mm]}}, thick] (0,0,0) -- (0,{max_val},0) node[above] {{$y$}};\n"
-        code += f"    \\draw[-{{Stealth[length=2mm]}}, thick] (0,0,0) -- (0,0,{max_val}) node[above] {{$z$}};\n"
+        axis = '-{Stealth[length=2mm]}, thick'
+        tikz.draw(axis, f"{origin} -- {x_end} node[right] {{$x$}}")
+        tikz.draw(axis, f"{origin} -- {y_end} node[above] {{$y$}}")
+        tikz.draw(axis, f"{origin} -- {z_end} node[above] {{$z$}}")
+        
+        # Coordenadas de todos los vectores, formateadas de una vez
+        points = bounds.coordinates(vectors)[:, :3]
+        ends = view.points(points)
+        label_at = view.points(points * 1.1)
+        shadows = view.points(points * (1, 1, 0))
         
         # Vectores
-        for vec, label, color in zip(vectors, labels, colors):
+        colors = colormap(len(points), colors)
+        styles = StyleRegistry.for_colors(colors)
+        layer = TikZEmitter()
+        for end, at, shadow, label, color in zip(ends, label_at, shadows, labels, colors):
             # Vector principal
-            code += f"    \\draw[-{{Stealth[length=3mm]}}, ultra thick, {color}] "
-            code += f"(0,0,0) -- ({vec[0]},{vec[1]},{vec[2]});\n"
+            layer.draw(styles(f'-{{Stealth[length=3mm]}}, ultra thick, {color}'), f"{origin} -- {end}")
             
             # Etiqueta
-            code += f"    \\node[{color}!80] at ({vec[0]*1.1},{vec[1]*1.1},{vec[2]*1.1}) "
-            code += f"{{$\\vect{{{label}}}$}};\n"
+            layer.node(styles(f'{color}!80'), at, f"$\\vect{{{label}}}$")
             
             # Punto final
-            code += f"    \\fill[{color}] ({vec[0]},{vec[1]},{vec[2]}) circle (2pt);\n"
+            layer.fill(styles(color), f"{end} circle (2pt)")
             
             # Proyección al plano XY
-            code += f"    \\draw[{color}!40, dashed, thin] "
-            code += f"({vec[0]},{vec[1]},{vec[2]}) -- ({vec[0]},{vec[1]},0);\n"
-            code += f"    \\fill[{color}!40] ({vec[0]},{vec[1]},0) circle (1pt);\n"
+            layer.draw(styles(f'{color}!40, dashed, thin'), f"{end} -- {shadow}")
+            layer.fill(styles(f'{color}!40'), f"{shadow} circle (1pt)")
         
-        code += r"\end{tikzpicture}" + "\n"
-        code += r"\caption{Visualización de vectores en $\R^3$}" + "\n"
-        code += r"\end{figure}" + "\n"
+        # Algoritmo del pintor: cada elemento según la profundidad de su
+        # punto medio (las etiquetas, la de su posición)
+        order = None
+        if self.depth_sort:
+            n = len(layer) // 5
+            end_depth = view.depth(points[:n])
+            shadow_depth = view.depth(points[:n] * (1, 1, 0))
+            order = painter_order(np.column_stack(
+                [end_depth / 2, end_depth * 1.1, end_depth, (end_depth + shadow_depth) / 2,
+                 shadow_depth]))
+        styles.emit(tikz)
+        tikz.extend(layer, order)
         
-        return code
+        tikz.end('tikzpicture')
+        tikz.command('caption', r'Visualización de vectores en $\R^3$')
+        tikz.end('figure')
+        
+        return tikz.getvalue()
     
     def create_comprehensive_demo(self):
         """Crea demostración completa"""
@@ -330,17 +381,23 @@ class VectorSpace3DComplete:
             ))
             self.doc.append(NoEscape(r'\end{itemize}'))
     
-    def generate(self, filename='demo_completo'):
-        """Genera el documento"""
-        self.doc.generate_tex(filename)
+    def generate(self, filename='demo_completo', cache=None, externalize=False,
+                 parallel=False, formats=False):
+        """
+        Genera el documento
+        
+        Las opciones de compilación son las de ``latex_build.build_document``.
+        """
+        write_tex(self.doc.dumps(), filename)
         print(f"✓ Archivo LaTeX generado: {filename}.tex")
         print(f"\nPara compilar:")
         print(f"  pdflatex {filename}.tex")
         print(f"  pdflatex {filename}.tex  (segunda vez para referencias)")
         
+        print()
         try:
-            self.doc.generate_pdf(filename, clean_tex=False)
-            print(f"\n✓ PDF generado exitosamente: {filename}.pdf")
+            build_document(self.doc, filename, cache=cache, externalize=externalize,
+                           parallel=parallel, formats=formats, written=True)
         except Exception as e:
             print(f"\n⚠ No se pudo generar PDF automáticamente: {e}")
             print(f"  Compila manualmente con: pdflatex {filename}.tex")
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+"""
+Colocación automática de etiquetas sin solapamientos
+
+Con posiciones fijas (``node[midway, above left]`` o un desplazamiento
+constante) las etiquetas de una figura densa se pisan unas a otras.
+``place_labels`` prueba para cada etiqueta varias posiciones alrededor de
+su ancla y se queda con la primera que no choca con las ya colocadas. Las
+cajas colocadas se indexan en una rejilla hash (``SpatialHash``) con celdas
+del tamaño de la etiqueta más grande, así que cada prueba mira solo unas
+pocas celdas vecinas y el costo total es casi lineal en el número de
+etiquetas. Si ninguna posición cercana está libre se prueba un anillo más
+lejano unido al ancla con una línea guía; si tampoco, la etiqueta se omite.
+
+Si el área de las etiquetas supera el área libre de la figura la mayoría
+no cabrá: en ese caso las anclas se agrupan en regiones del tamaño del
+anillo lejano y, tras ``SATURATION_MISSES`` etiquetas seguidas sin sitio en
+una región, las siguientes de esa región se omiten sin probar posiciones.
+
+Las cajas se estiman a partir del número de caracteres visibles del texto
+(``CHAR_WIDTH`` × ``LINE_HEIGHT`` en cm), en las unidades de la figura.
+"""
+
+import math
+import re
+
+import numpy as np
+
+from tikz_emitter import format_points
+
+# Ancho aproximado de un carácter y alto de una línea de etiqueta (cm)
+CHAR_WIDTH = 0.2
+LINE_HEIGHT = 0.45
+
+# Separación entre el ancla y la caja de la etiqueta (cm)
+LABEL_GAP = 0.05
+
+# Direcciones candidatas alrededor del ancla, en orden de preferencia
+DIRECTIONS = ((-1, 1), (1, 1), (-1, -1), (1, -1), (0, 1), (0, -1), (-1, 0), (1, 0))
+
+# Distancia relativa del anillo de posiciones con línea guía
+LEADER_RING = 3.0
+
+# Opciones de las líneas guía
+LEADER_STYLE = 'gray!60, very thin'
+
+# Etiquetas seguidas sin sitio tras las que una región se da por llena
+SATURATION_MISSES = 5
+
+_MARKUP = re.compile(r'\\[a-zA-Z]+|[{}$^_]')
+
+
+def label_size(text, scale=1.0):
+    """(ancho, alto) estimados de la etiqueta en unidades de una figura con ``scale``"""
+    visible = len(_MARKUP.sub('', text)) or 1
+    return (CHAR_WIDTH * visible + 0.1) / scale, LINE_HEIGHT / scale
+
+
+class SpatialHash:
+    """Rejilla hash de cajas (x0, y0, x1, y1) para consultas de solapamiento"""
+
+    __slots__ = ('cell', '_cells')
+
+    def __init__(self, cell):
+        self.cell = cell
+        self._cells = {}
+
+    def _keys(self, box):
+        x0, y0, x1, y1 = box
+        cell = self.cell
+        for i in range(math.floor(x0 / cell), math.floor(x1 / cell) + 1):
+            for j in range(math.floor(y0 / cell), math.floor(y1 / cell) + 1):
+                yield i, j
+
+    def overlaps(self, box):
+        """True si ``box`` se solapa con alguna caja insertada"""
+        x0, y0, x1, y1 = box
+        cells = self._cells
+        for key in self._keys(box):
+            for a0, b0, a1, b1 in cells.get(key, ()):
+                if x0 < a1 and a0 < x1 and y0 < b1 and b0 < y1:
+                    return True
+        return False
+
+    def insert(self, box):
+        for key in self._keys(box):
+            self._cells.setdefault(key, []).append(box)
+
+
+def place_labels(anchors, texts, scale=1.0, preferred=None, leaders=True):
+    """
+    Centros de las etiquetas, sin solapamientos, en orden de prioridad
+
+    Args:
+        anchors: Puntos (N, 2) a los que se refiere cada etiqueta
+        texts: Textos LaTeX de las etiquetas (para estimar su tamaño)
+        scale: Escala de la figura (las cajas se miden en cm)
+        preferred: Centros (N, 2) que se prueban antes que los automáticos
+        leaders: Si es False, las etiquetas sin sitio cercano se omiten
+
+    Returns:
+        (centros (N, 2) con NaN en las etiquetas omitidas,
+         máscara (N,) de las que necesitan línea guía)
+    """
+    anchors = np.asarray(anchors, dtype=float).reshape(-1, 2)
+    n = len(anchors)
+    centers = np.full((n, 2), np.nan)
+    leader = np.zeros(n, dtype=bool)
+    if n == 0:
+        return centers, leader
+
+    sizes = np.array([label_size(t, scale) for t in texts], dtype=float).reshape(-1, 2)
+    gap = LABEL_GAP / scale
+    half = sizes / 2
+    reach = half + gap
+    directions = np.array(DIRECTIONS, dtype=float)
+    index = SpatialHash(float(sizes.max()))
+
+    # Todas las posiciones candidatas, calculadas de una vez: (N, 8, 2)
+    near = anchors[:, None, :] + directions[None, :, :] * reach[:, None, :]
+    far = anchors[:, None, :] + directions[None, :, :] * reach[:, None, :] * LEADER_RING
+    if preferred is not None:
+        preferred = np.asarray(preferred, dtype=float).reshape(-1, 1, 2)
+        near = np.concatenate([preferred, near], axis=1)
+
+    rings = ((near, False), (far, True)) if leaders else ((near, False),)
+    regions = _saturation_regions(anchors, sizes, reach, far if leaders else near)
+    misses = {}
+    for i in range(n):
+        region = regions[i] if regions is not None else None
+        if misses.get(region, 0) >= SATURATION_MISSES:
+            continue
+        w, h = half[i]
+        for candidates, is_leader in rings:
+            spot = _first_free(index, candidates[i], w, h)
+            if spot is not None:
+                centers[i] = spot
+                leader[i] = is_leader
+                misses[region] = 0
+                break
+        else:
+            if region is not None:
+                misses[region] = misses.get(region, 0) + 1
+    return centers, leader
+
+
+def _saturation_regions(anchors, sizes, reach, candidates):
+    """
+    Región de cada ancla, o None si las etiquetas caben en el área libre
+
+    El área libre es la de la caja que contiene todas las posiciones
+    candidatas; las regiones son celdas del tamaño del anillo más lejano.
+    """
+    lo = candidates.reshape(-1, 2).min(axis=0) - sizes.max(axis=0) / 2
+    hi = candidates.reshape(-1, 2).max(axis=0) + sizes.max(axis=0) / 2
+    if (sizes[:, 0] * sizes[:, 1]).sum() <= np.prod(hi - lo):
+        return None
+    cell = LEADER_RING * float(reach.max())
+    return list(map(tuple, np.floor(anchors / cell).astype(np.int64).tolist()))
+
+
+def _first_free(index, candidates, w, h):
+    """Primer centro candidato cuya caja no choca; la inserta en el índice"""
+    for x, y in candidates.tolist():
+        box = (x - w, y - h, x + w, y + h)
+        if not index.overlaps(box):
+            index.insert(box)
+            return x, y
+    return None
+
+
+def label_layout(anchors, texts, scale=1.0, preferred=None):
+    """
+    Etiquetas colocadas por ``place_labels``, listas para escribirse
+
+    Returns:
+        (índices (M,) de las etiquetas colocadas, sus centros (M, 2),
+         máscara (M,) de las que necesitan línea guía)
+    """
+    anchors = np.asarray(anchors, dtype=float).reshape(-1, 2)
+    centers, leader = place_labels(anchors, texts, scale, preferred)
+    placed = np.flatnonzero(~np.isnan(centers[:, 0]))
+    return placed, centers[placed], leader[placed]
+
+
+def draw_labels(tikz, anchors, texts, styles, scale=1.0, preferred=None):
+    """
+    Coloca las etiquetas y las escribe en ``tikz`` como ``\\node``
+
+    ``styles`` son las opciones de cada nodo (p. ej. su color). Las que
+    quedan lejos se unen a su ancla con una línea guía. Devuelve cuántas
+    etiquetas se omitieron.
+    """
+    anchors = np.asarray(anchors, dtype=float).reshape(-1, 2)
+    placed, centers, leader = label_layout(anchors, texts, scale, preferred)
+    at = format_points(centers)
+    origins = format_points(anchors[placed])
+    for k, i in enumerate(placed.tolist()):
+        if leader[k]:
+            tikz.draw(LEADER_STYLE, f"{origins[k]} -- {at[k]}")
+        tikz.node(styles[i], at[k], texts[i])
+    return len(anchors) - len(placed)
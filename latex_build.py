@@ -0,0 +1,572 @@
+# -*- coding: utf-8 -*-
+"""
+Compilación de documentos LaTeX con caché de PDFs
+
+La clave de la caché es un hash del código .tex, del compilador y de las
+versiones instaladas de los paquetes TeX que usa el documento. Si el .tex no
+cambió desde una compilación anterior, el PDF se copia desde la caché local
+en vez de ejecutar pdflatex. La caché tiene un tamaño máximo y descarta los
+PDFs usados hace más tiempo (LRU).
+
+Con ``FigureCache`` cada figura TikZ se compila una sola vez como PDF
+independiente (clase standalone), indexada por el hash de su código, y el
+documento la incluye con ``\includegraphics``: si solo cambia el texto, o una
+figura de doscientas, solo se recompila lo que cambió.
+
+Con ``FormatCache`` el preámbulo (tikz, tikz-3dplot, pgfplots, babel,
+hyperref...) se vuelca una vez a un formato ``.fmt`` precompilado con
+mylatexformat y las compilaciones siguientes lo cargan con ``-fmt``. Cada
+preámbulo distinto tiene su formato; si no se puede generar, se compila de
+la forma normal.
+"""
+
+import collections
+import concurrent.futures
+import errno
+import functools
+import hashlib
+import itertools
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+
+from pylatex.errors import CompilerError
+
+from latex_stream import StreamingDocument
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    'VECTORSPACE3D_CACHE',
+    os.path.join(os.path.expanduser('~'), '.cache', 'vectorspace3d'))
+
+_USEPACKAGE = re.compile(r'\\usepackage(?:\[[^\]]*\])?\{([^}]*)\}')
+_DOCUMENTCLASS = re.compile(r'\\documentclass(?:\[[^\]]*\])?\{[^}]*\}')
+_GEOMETRY = re.compile(r'^\\usepackage(?:\[[^\]]*\])?\{geometry\}%?\n', re.M)
+_FIGURE = re.compile(r'(?:\\tdplotsetmaincoords\{[^}]*\}\{[^}]*\}\s*)?'
+                     r'\\begin\{tikzpicture\}.*?\\end\{tikzpicture\}', re.S)
+_AUX_EXTENSIONS = ('aux', 'log', 'out', 'fls', 'fdb_latexmk')
+
+
+@functools.lru_cache(maxsize=None)
+def _tool_version(compiler):
+    """Primera línea de ``compiler --version`` (o '?' si no está instalado)"""
+    try:
+        output = subprocess.run([compiler, '--version'], capture_output=True,
+                                text=True, check=False).stdout
+    except OSError:
+        return '?'
+    return output.splitlines()[0] if output else '?'
+
+
+@functools.lru_cache(maxsize=None)
+def _package_version(package):
+    """Ruta, tamaño y fecha del .sty instalado; cambia al actualizar el paquete"""
+    try:
+        path = subprocess.run(['kpsewhich', f'{package}.sty'], capture_output=True,
+                              text=True, check=False).stdout.strip()
+        stat = os.stat(path)
+    except OSError:
+        return f'{package}:?'
+    return f'{package}:{path}:{stat.st_size}:{int(stat.st_mtime)}'
+
+
+def toolchain_fingerprint(tex, compiler):
+    """Identifica el compilador y los paquetes TeX instalados que usa ``tex``"""
+    packages = sorted({name.strip() for group in _USEPACKAGE.findall(tex)
+                       for name in group.split(',')})
+    parts = [_tool_version(compiler or 'pdflatex')]
+    parts.extend(_package_version(p) for p in packages)
+    return '\n'.join(parts)
+
+
+class PDFBuildCache:
+    """Caché de PDFs direccionada por contenido con expulsión LRU por tamaño"""
+
+    subdir = 'pdf'
+    label = 'PDF'
+    suffix = '.pdf'
+
+    def __init__(self, cache_dir=None, max_bytes=500 * 1024**2):
+        self.cache_dir = os.path.join(cache_dir or DEFAULT_CACHE_DIR, self.subdir)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, tex, compiler=None):
+        """Hash del código .tex, el compilador y las versiones de los paquetes"""
+        digest = hashlib.sha256()
+        digest.update((compiler or 'auto').encode())
+        digest.update(b'\0')
+        digest.update(toolchain_fingerprint(tex, compiler).encode())
+        digest.update(b'\0')
+        digest.update(tex.encode('utf-8'))
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + self.suffix)
+
+    def fetch(self, key, pdf_path):
+        """Copia el PDF cacheado a ``pdf_path``; devuelve False si no existe"""
+        cached = self._path(key)
+        try:
+            shutil.copyfile(cached, pdf_path)
+        except FileNotFoundError:
+            self.misses += 1
+            return False
+        os.utime(cached)  # marca de uso para la política LRU
+        self.hits += 1
+        return True
+
+    def store(self, key, pdf_path):
+        """Guarda un PDF recién compilado y aplica el límite de tamaño"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp = self._path(key) + f'.{os.getpid()}.tmp'
+        shutil.copyfile(pdf_path, tmp)
+        os.replace(tmp, self._path(key))
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(self.suffix):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def report(self):
+        return f"caché de {self.label}: {self.hits} aciertos, {self.misses} fallos"
+
+
+class FigureCache(PDFBuildCache):
+    """Caché persistente de figuras TikZ compiladas por separado"""
+
+    subdir = 'fig'
+    label = 'figuras'
+
+    def externalize(self, tex, filepath, compiler=None):
+        """
+        Sustituye cada tikzpicture de ``tex`` por ``\\includegraphics``
+
+        Las figuras quedan en ``<filepath>-figuras/<hash>.pdf``. Devuelve el
+        nuevo código y la lista de figuras que hay que compilar. Las figuras
+        se compilan con el directorio del documento en TEXINPUTS, para que
+        encuentren sus tablas de datos.
+        """
+        head, body = split_preamble(tex)
+        preamble = standalone_preamble(head)
+        fig_dir = filepath + '-figuras'
+        rel_dir = os.path.basename(fig_dir)
+        jobs = []
+        keys = set()
+
+        def replace(match):
+            source = preamble + '\\begin{document}%\n' + _standalone_body(match.group(0)) \
+                + '%\n\\end{document}\n'
+            key = self.key(source, compiler)
+            dest = os.path.join(fig_dir, key + '.pdf')
+            if key not in keys:
+                keys.add(key)
+                if os.path.exists(dest):
+                    self.hits += 1
+                elif not self.fetch(key, dest):
+                    jobs.append(FigureJob(key, source, dest, os.path.dirname(filepath)))
+            return f'\\includegraphics{{{rel_dir}/{key}.pdf}}'
+
+        os.makedirs(fig_dir, exist_ok=True)
+        body = _FIGURE.sub(replace, body)
+        if not re.search(r'\\usepackage(?:\[[^\]]*\])?\{[^}]*\bgraphicx\b', head):
+            head += '\\usepackage{graphicx}%\n'
+        return head + body, jobs
+
+    def compile(self, jobs, compiler=None, workers=1, formats=None):
+        """
+        Compila las figuras pendientes y las guarda en la caché
+
+        Con ``workers`` > 1 las figuras se compilan en paralelo en un pool de
+        procesos (cada figura es un trabajo pdflatex independiente). Todas
+        comparten el preámbulo standalone, así que con ``formats`` (un
+        FormatCache) se cargan desde un único formato precompilado.
+        """
+        fmt = formats.format_for(jobs[0].source, compiler) if formats and jobs else None
+        pending = jobs
+        if fmt is not None:
+            # La primera figura prueba el formato: si falla se descarta y las
+            # demás se compilan directamente sin él
+            fmt = _compile_figure(jobs[0], self.cache_dir, compiler, fmt, formats)
+            pending = jobs[1:]
+        if workers > 1 and len(pending) > 1:
+            with concurrent.futures.ProcessPoolExecutor(min(workers, len(pending))) as pool:
+                list(pool.map(_compile_figure, pending, itertools.repeat(self.cache_dir),
+                              itertools.repeat(compiler), itertools.repeat(fmt)))
+        else:
+            for job in pending:
+                _compile_figure(job, self.cache_dir, compiler, fmt, formats)
+        for job in jobs:
+            self.store(job.key, job.dest)
+
+
+class FormatCache(PDFBuildCache):
+    """Formatos .fmt precompilados, uno por cada preámbulo distinto"""
+
+    subdir = 'fmt'
+    label = 'formatos'
+    suffix = '.fmt'
+
+    def __init__(self, cache_dir=None, max_bytes=2 * 1024**3):
+        super().__init__(cache_dir, max_bytes)
+        self._failed = set()
+
+    def format_for(self, tex, compiler=None):
+        """
+        Ruta del formato para el preámbulo de ``tex``, generándolo si falta
+
+        Devuelve None si el compilador no es pdflatex o si el formato no se
+        puede volcar (p. ej. sin mylatexformat); entonces se compila normal.
+        """
+        if compiler not in (None, 'pdflatex', 'latexmk'):
+            return None
+        head, _ = split_preamble(tex)
+        key = self.key(head, 'pdflatex')
+        path = self._path(key)
+        if key in self._failed:
+            return None
+        if os.path.exists(path):
+            os.utime(path)
+            self.hits += 1
+            return path
+        self.misses += 1
+        if not _dump_format(head, self.cache_dir, key):
+            self._failed.add(key)
+            return None
+        self._evict()
+        return path
+
+    def discard(self, path):
+        """Descarta un formato que no sirvió para compilar"""
+        self._failed.add(os.path.basename(path)[:-len(self.suffix)])
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+FigureJob = collections.namedtuple('FigureJob', 'key source dest inputs')
+
+
+def split_preamble(tex):
+    """Divide el código en (preámbulo, cuerpo desde \\begin{document})"""
+    index = tex.index('\\begin{document}')
+    return tex[:index], tex[index:]
+
+
+def standalone_preamble(preamble):
+    """
+    Preámbulo del documento adaptado a la clase standalone
+
+    Se quitan geometry (rompe el recorte de standalone) y título, autor y
+    fecha, que no afectan a las figuras y cambiarían su hash.
+    """
+    preamble = _DOCUMENTCLASS.sub(lambda m: '\\documentclass{standalone}', preamble, count=1)
+    preamble = _GEOMETRY.sub('', preamble)
+    for command in ('title', 'author', 'date'):
+        preamble = _remove_command(preamble, command)
+    return preamble
+
+
+def _remove_command(tex, command):
+    """Elimina ``\\command{...}`` con llaves balanceadas (puede ocupar varias líneas)"""
+    start = tex.find(f'\\{command}{{')
+    if start < 0:
+        return tex
+    depth = 0
+    for end in range(start + len(command) + 1, len(tex)):
+        if tex[end] == '{' and tex[end - 1] != '\\':
+            depth += 1
+        elif tex[end] == '}' and tex[end - 1] != '\\':
+            depth -= 1
+            if depth == 0:
+                if tex.startswith('%\n', end + 1):
+                    end += 2
+                return tex[:start] + tex[end + 1:]
+    return tex
+
+
+def _standalone_body(figure):
+    # Sin espacios entre \tdplotsetmaincoords y la figura: standalone los
+    # dibujaría como margen
+    setup, sep, picture = figure.partition('\\begin{tikzpicture}')
+    return setup.strip() + '%\n' + sep + picture if setup.strip() else figure
+
+
+@functools.lru_cache(maxsize=None)
+def _has_mylatexformat():
+    try:
+        return bool(subprocess.run(['kpsewhich', 'mylatexformat.ltx'], capture_output=True,
+                                   text=True, check=False).stdout.strip())
+    except OSError:
+        return False
+
+
+def _dump_format(preamble, fmt_dir, key):
+    """Vuelca ``preamble`` a ``fmt_dir/key.fmt`` con pdftex -ini y mylatexformat"""
+    if not _has_mylatexformat():
+        return False
+    os.makedirs(fmt_dir, exist_ok=True)
+    build_dir = tempfile.mkdtemp(dir=fmt_dir)
+    try:
+        write_tex(preamble + '\\begin{document}\n\\end{document}\n', os.path.join(build_dir, key))
+        subprocess.run(['pdftex', '-ini', '-interaction=nonstopmode', f'-jobname={key}',
+                        '&pdflatex', 'mylatexformat.ltx', f'{key}.tex'],
+                       cwd=build_dir, capture_output=True, check=True)
+        os.replace(os.path.join(build_dir, key + '.fmt'), os.path.join(fmt_dir, key + '.fmt'))
+        return True
+    except (OSError, subprocess.CalledProcessError):
+        return False
+    finally:
+        shutil.rmtree(build_dir, ignore_errors=True)
+
+
+def _compile_figure(job, cache_dir, compiler=None, fmt=None, formats=None):
+    """
+    Compila una figura standalone y deja el PDF en ``job.dest``
+
+    Devuelve el formato usado, como ``compile_with_format``.
+    """
+    build_root = os.path.join(cache_dir, 'build')
+    os.makedirs(build_root, exist_ok=True)
+    build_dir = tempfile.mkdtemp(dir=build_root)
+    try:
+        filepath = os.path.join(build_dir, job.key)
+        write_tex(job.source, filepath)
+        fmt = compile_with_format(filepath, compiler or 'pdflatex', fmt, formats,
+                                  inputs=job.inputs)
+        shutil.move(filepath + '.pdf', job.dest)
+        return fmt
+    finally:
+        shutil.rmtree(build_dir, ignore_errors=True)
+
+
+_default_cache = None
+_default_figure_cache = None
+_default_formats = None
+
+
+def resolve_cache(cache):
+    """``True`` usa la caché compartida por defecto; ``None``/``False``, ninguna"""
+    global _default_cache
+    if cache is True:
+        if _default_cache is None:
+            _default_cache = PDFBuildCache()
+        return _default_cache
+    return cache or None
+
+
+def resolve_formats(formats):
+    """``True`` usa la caché de formatos compartida por defecto"""
+    global _default_formats
+    if formats is True:
+        if _default_formats is None:
+            _default_formats = FormatCache()
+        return _default_formats
+    return formats or None
+
+
+def resolve_figure_cache(figures):
+    """``True`` usa la caché de figuras compartida por defecto"""
+    global _default_figure_cache
+    if figures is True:
+        if _default_figure_cache is None:
+            _default_figure_cache = FigureCache()
+        return _default_figure_cache
+    return figures or None
+
+
+def write_tex(tex, filepath):
+    """Escribe ``filepath.tex`` en UTF-8, como ``Document.generate_tex``"""
+    with open(filepath + '.tex', 'w', encoding='utf-8') as f:
+        f.write(tex)
+
+
+def compile_tex(filepath, compiler=None, compiler_args=None, silent=True, clean=True,
+                fmt=None, inputs=None):
+    """
+    Compila ``filepath.tex`` en su propio directorio
+
+    Igual que ``pylatex.Document.generate_pdf``: si no se indica compilador
+    prueba latexmk y luego pdflatex. ``fmt`` es la ruta de un formato .fmt
+    precompilado para el preámbulo; ``inputs``, un directorio adicional
+    donde TeX busca archivos (TEXINPUTS).
+    """
+    filepath = os.path.abspath(filepath)
+    dest_dir = os.path.dirname(filepath)
+
+    if compiler is not None:
+        compilers = ((compiler, []),)
+    else:
+        compilers = (('latexmk', ['--pdf']), ('pdflatex', []))
+
+    env = None
+    if inputs is not None:
+        env = dict(os.environ, TEXINPUTS=inputs + os.pathsep + os.environ.get('TEXINPUTS', ''))
+    if fmt is not None:
+        fmt_dir, fmt_name = os.path.split(fmt)
+        fmt_name = os.path.splitext(fmt_name)[0]
+        env = dict(env or os.environ,
+                   TEXFORMATS=fmt_dir + os.pathsep + os.environ.get('TEXFORMATS', ''))
+        fmt_args = {'pdflatex': [f'-fmt={fmt_name}'],
+                    'latexmk': [f'-pdflatex=pdflatex -fmt={fmt_name} %O %S']}
+        compilers = tuple((name, arguments + fmt_args.get(name, []))
+                          for name, arguments in compilers)
+
+    for name, arguments in compilers:
+        command = ([name] + arguments + list(compiler_args or [])
+                   + ['--interaction=nonstopmode', filepath + '.tex'])
+        try:
+            output = subprocess.check_output(command, stderr=subprocess.STDOUT, cwd=dest_dir,
+                                             env=env)
+        except OSError as e:
+            if e.errno == errno.ENOENT:
+                continue
+            raise
+        except subprocess.CalledProcessError as e:
+            if fmt is None:
+                print(e.output.decode(errors='replace'))
+            raise
+        if not silent:
+            print(output.decode(errors='replace'))
+        break
+    else:
+        raise CompilerError("No LaTex compiler was found\n"
+                            "Either specify a LaTex compiler "
+                            "or make sure you have latexmk or pdfLaTex installed.")
+
+    if clean:
+        for ext in _AUX_EXTENSIONS:
+            try:
+                os.remove(f'{filepath}.{ext}')
+            except FileNotFoundError:
+                pass
+
+
+def compile_with_format(filepath, compiler=None, fmt=None, formats=None, silent=True,
+                        inputs=None):
+    """
+    Compila con el formato precompilado y, si falla, de la forma normal
+
+    Un formato que falla se descarta de ``formats``. Devuelve el formato
+    usado, o None si se compiló sin formato.
+    """
+    if fmt is not None:
+        try:
+            compile_tex(filepath, compiler, silent=silent, fmt=fmt, inputs=inputs)
+            return fmt
+        except subprocess.CalledProcessError:
+            if formats is not None:
+                formats.discard(fmt)
+    compile_tex(filepath, compiler, silent=silent, inputs=inputs)
+    return None
+
+
+def resolve_workers(parallel):
+    """``True`` usa todos los núcleos; un entero, ese número de procesos"""
+    if parallel is True:
+        return os.cpu_count() or 1
+    return max(1, int(parallel or 1))
+
+
+def build_pdf(tex, filepath, compiler=None, cache=None, figures=None, parallel=False,
+              formats=None, silent=True):
+    """
+    Escribe ``filepath.tex`` y produce ``filepath.pdf``
+
+    Con ``cache`` (un PDFBuildCache, o True para la caché por defecto) se
+    evita compilar si el mismo .tex ya se compiló antes con el mismo
+    compilador y paquetes. Con ``figures`` (un FigureCache, o True) cada
+    figura TikZ se compila aparte una sola vez y se incluye como PDF.
+    ``parallel`` (True o un número de procesos) compila esas figuras en un
+    pool de procesos y activa la externalización si no se indicó. Con
+    ``formats`` (un FormatCache, o True) el preámbulo se carga desde un
+    formato .fmt precompilado.
+    Si ``tex`` es None, ``filepath.tex`` ya está escrito (p. ej. por un
+    StreamingDocument) y solo se lee si hace falta para cachés o figuras.
+    Devuelve True si el PDF salió de la caché.
+    """
+    filepath = os.path.abspath(filepath)
+    cache = resolve_cache(cache)
+    workers = resolve_workers(parallel)
+    figures = resolve_figure_cache(figures or bool(parallel))
+    formats = resolve_formats(formats)
+
+    if tex is None:
+        if cache is None and figures is None and formats is None:
+            compile_tex(filepath, compiler, silent=silent)
+            return False
+        with open(filepath + '.tex', encoding='utf-8') as f:
+            tex = f.read()
+    if figures is not None:
+        tex, jobs = figures.externalize(tex, filepath, compiler)
+        figures.compile(jobs, compiler, workers, formats)
+    write_tex(tex, filepath)
+
+    key = None
+    if cache is not None:
+        key = cache.key(tex, compiler)
+        if cache.fetch(key, filepath + '.pdf'):
+            return True
+
+    fmt = formats.format_for(tex, compiler) if formats is not None else None
+    compile_with_format(filepath, compiler, fmt, formats, silent=silent)
+
+    if key is not None:
+        cache.store(key, filepath + '.pdf')
+    return False
+
+
+def build_document(doc, filepath, compiler=None, cache=None, externalize=False,
+                   parallel=False, formats=False, written=False):
+    """
+    Compila un documento de PyLaTeX (o un StreamingDocument) en ``filepath.pdf``
+
+    Con cache=True (o un PDFBuildCache) no se recompila si el .tex no
+    cambió desde la última compilación. Con externalize=True (o un
+    FigureCache) cada figura TikZ se compila aparte una sola vez y se
+    incluye como PDF; parallel=True (o un número de procesos) compila
+    esas figuras en paralelo y luego ensambla el PDF en una pasada.
+    Con formats=True (o un FormatCache) el preámbulo se carga desde un
+    formato .fmt precompilado, regenerado solo cuando cambia.
+    Con written=True ``filepath.tex`` ya contiene el documento (lo escribió
+    quien llama) y no se vuelve a volcar.
+
+    Imprime el resultado y el estado de las cachés usadas; los errores de
+    compilación se propagan. Devuelve True si el PDF salió de la caché.
+    """
+    cache = resolve_cache(cache)
+    figures = resolve_figure_cache(externalize or bool(parallel))
+    formats = resolve_formats(formats)
+    if written:
+        tex = None
+    elif isinstance(doc, StreamingDocument):
+        doc.generate_tex(filepath)
+        tex = None
+    else:
+        tex = doc.dumps()
+
+    cached = build_pdf(tex, filepath, compiler, cache=cache, figures=figures,
+                       parallel=parallel, formats=formats)
+    if cached:
+        print(f"✓ PDF recuperado de la caché: {filepath}.pdf")
+    else:
+        print(f"✓ PDF generado: {filepath}.pdf")
+    for used in (cache, figures, formats):
+        if used is not None:
+            print(f"  ({used.report()})")
+    return cached
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""
+Escritura del .tex en streaming, sin árbol PyLaTeX en memoria
+
+``StreamingDocument`` imita la parte de ``pylatex.Document`` que usan
+VectorDocument y VectorSpace3D (``packages``, ``preamble``, ``append`` y
+``create``), pero escribe cada fragmento en el archivo en cuanto se añade.
+La memoria no crece con el número de secciones y figuras, y el archivo
+resultante es idéntico byte a byte al de ``Document.dumps()``.
+
+El preámbulo se escribe con el primer contenido del cuerpo: los paquetes y
+comandos del preámbulo deben declararse antes. Las secciones creadas con
+``create`` se escriben incrementalmente; cualquier otro contenedor (Math,
+Figure...) se acumula y se escribe completo al cerrar su bloque ``with``.
+
+Sin ``filepath`` el documento se escribe en un archivo temporal. Si no se
+llega a generar (se descarta, o falla algo antes), ``close()``, el bloque
+``with`` o la recolección del objeto lo borran.
+"""
+
+import contextlib
+import os
+import shutil
+import tempfile
+import weakref
+
+from pylatex import Document
+from pylatex.base_classes import Container, LatexObject
+from pylatex.section import Section
+from pylatex.utils import _latex_item_to_string
+
+_BEGIN_DOCUMENT = '\\begin{document}%\n'
+
+
+def _discard(file, spool):
+    """Cierra el archivo y borra el temporal de un documento que no se generó"""
+    file.close()
+    if spool is not None:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(spool)
+
+
+class _Sink:
+    """Destino de ``append`` que escribe cada elemento en el archivo"""
+
+    def __init__(self, writer, container):
+        self.writer = writer
+        self.escape = container.escape
+        self.separator = container.content_separator
+        self.empty = True
+
+    def append(self, item):
+        self.writer._check_packages(item)
+        self.write(_latex_item_to_string(item, escape=self.escape, as_content=True))
+
+    def write(self, text):
+        self.writer._emit(text if self.empty else self.separator + text)
+        self.empty = False
+
+    def extend(self, items):
+        for item in items:
+            self.append(item)
+
+
+class StreamingDocument:
+    """Documento LaTeX que se escribe en un archivo a medida que se construye"""
+
+    def __init__(self, filepath=None, **document_kwargs):
+        """
+        Args:
+            filepath: Ruta del .tex (sin extensión). Si es None se escribe en
+                un archivo temporal que ``generate_tex`` mueve a su destino.
+            document_kwargs: Argumentos de ``pylatex.Document``
+        """
+        self._head = Document(**document_kwargs)
+        self._initial = list(self._head.data)
+        self._head.data = []
+        if filepath is None:
+            fd, self._path = tempfile.mkstemp(suffix='.tex')
+            self._file = os.fdopen(fd, 'w', encoding='utf-8')
+            spool = self._path
+        else:
+            self._path = filepath + '.tex'
+            self._file = open(self._path, 'w', encoding='utf-8')
+            spool = None
+        self._finalizer = weakref.finalize(self, _discard, self._file, spool)
+        self._preamble = None
+        self._tail = ''
+        self._levels = [_Sink(self, self._head)]
+
+    @property
+    def packages(self):
+        return self._head.packages
+
+    @property
+    def preamble(self):
+        return self._head.preamble
+
+    @property
+    def closed(self):
+        return self._file.closed
+
+    def close(self):
+        """Descarta un documento sin generar: cierra el archivo y borra el temporal"""
+        self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _dumps_head(self):
+        tex = self._head.dumps()
+        return tex[:tex.index(_BEGIN_DOCUMENT) + len(_BEGIN_DOCUMENT)]
+
+    def _start(self):
+        if self._preamble is None:
+            self._preamble = self._dumps_head()
+            self._file.write(self._preamble)
+            self._levels[0].extend(self._initial)
+            self._initial = None
+
+    def _emit(self, text):
+        # Los saltos de línea finales se retienen: al cerrar una sección,
+        # PyLaTeX los reemplaza por un único fin de párrafo (rstrip + \n\n)
+        text = self._tail + text
+        body = text.rstrip('\n')
+        self._file.write(body)
+        self._tail = text[len(body):]
+
+    def _check_packages(self, item):
+        if not isinstance(item, LatexObject):
+            return
+        if isinstance(item, Container):
+            item._propagate_packages()
+        missing = [p for p in item.packages if p not in self._head.packages]
+        if missing:
+            raise ValueError("El preámbulo ya se escribió; declara antes los paquetes: "
+                             + ', '.join(p.dumps() for p in missing))
+
+    def append(self, item):
+        """Añade contenido al cuerpo (o a la sección abierta)"""
+        if self.closed:
+            raise ValueError("El documento en streaming ya se cerró")
+        self._start()
+        self._levels[-1].append(item)
+
+    @contextlib.contextmanager
+    def create(self, child):
+        """Como ``Container.create``; las secciones se escriben sin acumularse"""
+        parent = self._levels[-1]
+        if not isinstance(parent, _Sink) or not isinstance(child, Section) \
+                or child.begin_paragraph or child.separate_paragraph:
+            self._levels.append(child.data)
+            try:
+                yield child
+            finally:
+                self._levels.pop()
+            self.append(child)
+            return
+
+        self._start()
+        self._check_packages(child)
+        data, child.data = child.data, []
+        parent.write(child.dumps())  # \section{...}%\n\label{...}%\n
+        sink = _Sink(self, child)
+        child.data = sink
+        self._levels.append(sink)
+        try:
+            sink.extend(data)
+            yield child
+        finally:
+            self._levels.pop()
+            child.data = []
+        self._tail = '\n\n' if child.end_paragraph else self._tail
+
+    def generate_tex(self, filepath=None):
+        """
+        Cierra el documento y deja el .tex en ``filepath.tex``
+
+        Si el documento se escribía en un temporal, se mueve a ``filepath``.
+        """
+        if not self.closed:
+            self._start()
+            self._file.write(self._tail + '%\n\\end{document}')
+            self._tail = ''
+            self._file.close()
+            if self._dumps_head() != self._preamble:
+                raise ValueError("El preámbulo cambió después de empezar a escribir el cuerpo")
+        if filepath is not None and os.path.abspath(filepath + '.tex') != os.path.abspath(self._path):
+            shutil.move(self._path, filepath + '.tex')
+            self._path = filepath + '.tex'
+        # El .tex ya es de quien lo pidió: no se borra al descartar el objeto
+        self._finalizer.detach()
+        return self._path
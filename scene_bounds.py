@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+Límites de la escena y paso de la cuadrícula de las figuras
+
+Todos los generadores de figuras calculan el mismo tamaño de escena (el
+mayor valor absoluto de las componentes por un margen) y dibujaban la
+cuadrícula con paso 1: con componentes del orden de miles eso son millones
+de líneas y TeX se queda sin memoria. ``SceneBounds`` calcula el límite una
+sola vez, por bloques y vectorizado, y elige el paso de la cuadrícula
+(1, 2 o 5 por una potencia de 10) para que nunca haya más de
+``MAX_GRID_LINES`` líneas por eje. Con rangos pequeños el paso sigue
+siendo 1.
+
+Reducir ``scale`` no basta con coordenadas grandes: TikZ multiplica cada
+coordenada por el vector unidad (1 cm) antes de aplicar la escala, así que
+``(3600,0)`` desborda las dimensiones de TeX (~575 cm) con cualquier
+``scale``. Por eso, si el límite pasa de ``MAX_COORDINATE``, la escena se
+mide en unidades de ``unit`` (una potencia de 10) y los generadores dividen
+sus coordenadas por ``unit`` antes de escribirlas; ``limit`` y ``step`` ya
+están en esas unidades. ``fit_scale`` convierte la escala preferida a esas
+unidades y la reduce si la figura pasaría de ``MAX_HALF_SIZE`` cm desde el
+origen.
+
+>>> bounds = SceneBounds.from_vectors([(12000, -9500)], 2, margin=1.2)
+>>> bounds
+SceneBounds(limit=14.4, step=1, unit=1000)
+>>> bounds.fit_scale(1.5) * bounds.limit <= MAX_HALF_SIZE
+True
+
+Ninguna coordenada de las figuras, multiplicada por el vector unidad
+(1 cm, o la suma de los tres ejes de tikz-3dplot), llega al límite de TeX:
+
+>>> import re
+>>> from vectorspace3d_main import VectorSpace3D
+>>> vs = VectorSpace3D.__new__(VectorSpace3D)
+>>> vs.project_3d = False
+>>> vectores = [(12000, -9500, 300), (-3000, 8000, -15000)]
+>>> for figura, ejes in ((vs._generate_2d_plot([v[:2] for v in vectores], 'ab', None, True), 1),
+...                      (vs._generate_3d_plot(vectores, 'ab', None, (70, 120)), 3)):
+...     grupos = re.findall(r'\(([-0-9.,]+)\)', figura)
+...     mayor = max(abs(float(c)) for g in grupos for c in g.split(','))
+...     print(mayor * ejes < TEX_MAX_CM)
+True
+True
+"""
+
+import math
+
+import numpy as np
+
+from tikz_emitter import format_number
+from vector_density import extent
+
+# Máximo de líneas de la cuadrícula por eje
+MAX_GRID_LINES = 40
+
+# Máxima distancia (cm) del origen al borde de la figura una vez escalada
+MAX_HALF_SIZE = 10.0
+
+# Mayor dimensión de TeX (16383.99999 pt) en cm
+TEX_MAX_CM = 575.83
+
+# Mayor coordenada que se escribe en una figura; por encima, las
+# coordenadas se dividen por una potencia de 10
+MAX_COORDINATE = 100.0
+
+
+def max_abs(vectors, dim):
+    """Mayor valor absoluto de las primeras ``dim`` componentes, por bloques"""
+    lo, hi = extent(vectors, range(dim))
+    bound = max(np.abs(lo).max(), np.abs(hi).max())
+    return float(bound) if np.isfinite(bound) else 0.0
+
+
+def nice_step(span, max_lines=None, min_step=1.0):
+    """Menor paso 1, 2 o 5 × 10^k (al menos ``min_step``) con span / paso <= max_lines"""
+    max_lines = max_lines or MAX_GRID_LINES
+    raw = span / max_lines
+    if not np.isfinite(raw) or raw <= min_step:
+        return min_step
+    power = 10.0 ** math.floor(math.log10(raw))
+    for factor in (1, 2, 5, 10):
+        if factor * power >= raw:
+            return factor * power
+    return 10 * power
+
+
+def coordinate_unit(limit):
+    """Menor potencia de 10 (al menos 1) con limit / unidad <= MAX_COORDINATE"""
+    if not np.isfinite(limit) or limit <= MAX_COORDINATE:
+        return 1.0
+    return 10.0 ** math.ceil(math.log10(limit / MAX_COORDINATE))
+
+
+class SceneBounds:
+    """Límite simétrico de una escena y paso de su cuadrícula"""
+
+    __slots__ = ('limit', 'step', 'unit')
+
+    def __init__(self, limit, max_lines=None):
+        """``limit`` en las unidades de los vectores; se guarda dividido por ``unit``"""
+        limit = float(limit)
+        self.unit = coordinate_unit(limit)
+        self.limit = limit / self.unit
+        self.step = nice_step(2 * self.limit, max_lines)
+
+    @classmethod
+    def from_vectors(cls, vectors, dim, margin=1.0, max_lines=None):
+        """Límite = mayor componente en valor absoluto × ``margin``"""
+        return cls(max_abs(vectors, dim) * margin, max_lines)
+
+    def coordinates(self, points):
+        """``points`` como arreglo, en las unidades de la figura"""
+        return np.asarray(points, dtype=float) / self.unit
+
+    def fit_scale(self, scale):
+        """
+        Escala de la figura para ``scale`` (dada para las coordenadas sin
+        dividir), reducida si la escena mediría más de MAX_HALF_SIZE cm
+        """
+        scale = scale * self.unit
+        if self.limit * scale <= MAX_HALF_SIZE:
+            return scale
+        return MAX_HALF_SIZE / self.limit
+
+    def grid_options(self, options):
+        """Opciones de ``\\draw ... grid`` con el paso adaptado (si no es 1)"""
+        if self.step == 1:
+            return options
+        return f"{options}, step={format_number(self.step)}"
+
+    def __repr__(self):
+        return f"SceneBounds(limit={self.limit:g}, step={self.step:g}, unit={self.unit:g})"
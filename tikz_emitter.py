@@ -0,0 +1,347 @@
+# -*- coding: utf-8 -*-
+"""
+Constructor de código TikZ sobre un búfer de líneas
+
+Los generadores de figuras acumulaban el código con ``code += ...`` dentro
+de los bucles por vector, lo que copia la cadena completa en cada paso.
+``TikZEmitter`` guarda cada línea en una lista y las une una sola vez al
+final, así que el costo es lineal en el número de vectores.
+
+Ejemplo::
+
+    tikz = TikZEmitter()
+    tikz.begin('tikzpicture', 'scale=1.5')
+    tikz.draw('->, thick, blue', f"(0,0) -- {point(3, 2)}")
+    tikz.end('tikzpicture')
+    codigo = tikz.getvalue()
+
+Las coordenadas se formatean con ``format_points`` / ``format_numbers``:
+todo un arreglo de NumPy de una vez, con ``SIGNIFICANT_DIGITS`` cifras
+significativas, sin notación exponencial y sin ceros sobrantes
+(``0.7071067811865476`` se escribe ``0.7071``, ``3.0`` se escribe ``3``).
+``format_tuple`` escribe un vector como ``(a, b, \\ldots, z)``, sin formatear
+las componentes que no se muestran.
+
+Las opciones que se repiten en cada flecha se registran una vez por figura
+en un ``StyleRegistry`` (``\\tikzset{vs0/.style={...}}``) y cada comando usa
+el nombre corto; en las figuras con ``\\foreach``, ``ColorRegistry`` nombra
+igual el color de cada entrada (``\\colorlet{vc0}{...}``). ``colormap``
+asigna un color a cada uno de N vectores sin truncar la lista de colores.
+
+Con muchos vectores, ``foreach`` escribe los datos una sola vez como lista
+(``x/y/color/etiqueta`` por vector) y los comandos de dibujo una sola vez en
+el cuerpo de un ``\\foreach`` de pgf, en vez de repetirlos por vector.
+"""
+
+import numpy as np
+
+# Cifras significativas por defecto de las coordenadas
+SIGNIFICANT_DIGITS = 4
+
+# TeX trabaja en punto fijo con 16 bits de fracción (~1.5e-5): más
+# decimales solo alargan el archivo
+MAX_DECIMALS = 5
+
+# Componentes que se muestran de un vector antes de abreviarlo con \ldots
+MAX_SHOWN_COMPONENTS = 8
+
+# Colores por defecto de los vectores
+DEFAULT_PALETTE = ('blue', 'red', 'green', 'orange', 'purple')
+
+# Colores distintos como máximo en un colormap (acota los estilos por figura)
+MAX_COLORMAP_COLORS = 16
+
+_ZERO, _DOT, _MINUS = ord('0'), ord('.'), ord('-')
+
+
+def _number_matrix(values, digits, max_decimals):
+    """
+    Texto de cada número como matriz (N, W) de bytes alineada a la derecha
+
+    Las posiciones sin usar quedan en 0 y se eliminan al unir las filas, así
+    que todo el formateo se hace con operaciones vectorizadas de NumPy.
+    """
+    values = np.asarray(values, dtype=float).ravel()
+    if not np.isfinite(values).all():
+        raise ValueError("Las coordenadas deben ser finitas")
+    if values.size == 0:
+        return np.zeros((0, 0), dtype=np.uint8)
+
+    with np.errstate(divide='ignore'):
+        exponent = np.floor(np.log10(np.abs(values)))
+    exponent[np.isinf(exponent)] = 0
+    decimals = np.clip(digits - 1 - exponent, 0, max_decimals).astype(np.int64)
+    magnitude = np.rint(np.abs(values) * 10.0 ** decimals)
+    if magnitude.max() >= 2.0 ** 53:
+        raise ValueError("Coordenada demasiado grande para TikZ")
+    magnitude = magnitude.astype(np.int64)
+
+    # Quitar ceros finales de la parte decimal
+    for _ in range(max_decimals):
+        strip = (decimals > 0) & (magnitude % 10 == 0)
+        if not strip.any():
+            break
+        magnitude[strip] //= 10
+        decimals[strip] -= 1
+
+    n_digits = np.ones_like(magnitude)
+    rest = magnitude // 10
+    while rest.any():
+        n_digits += rest > 0
+        rest //= 10
+    length = np.maximum(n_digits, decimals + 1)  # al menos "0.xxx"
+    has_dot = decimals > 0
+    width = int(length.max()) + 2  # signo y punto decimal
+
+    out = np.zeros((values.size, width), dtype=np.uint8)
+    rows = np.arange(values.size)
+    rest = magnitude.copy()
+    for k in range(int(length.max())):
+        active = k < length
+        column = width - 1 - k - (has_dot & (k >= decimals))
+        out[rows[active], column[active]] = _ZERO + rest[active] % 10
+        rest //= 10
+    out[rows[has_dot], width - 1 - decimals[has_dot]] = _DOT
+    negative = (values < 0) & (magnitude > 0)
+    out[rows[negative], (width - 1 - length - has_dot)[negative]] = _MINUS
+    return out
+
+
+def _join_rows(matrix):
+    text = np.ascontiguousarray(matrix).tobytes().replace(b'\0', b'').decode('ascii')
+    return text.split('\n')[:-1]
+
+
+def format_numbers(values, digits=None):
+    """Lista de cadenas para todos los valores (aplanados) de ``values``"""
+    digits = digits or SIGNIFICANT_DIGITS
+    matrix = _number_matrix(values, digits, MAX_DECIMALS)
+    newline = np.full((matrix.shape[0], 1), ord('\n'), dtype=np.uint8)
+    return _join_rows(np.hstack([matrix, newline]))
+
+
+def format_rows(rows, digits=None, open='', sep=' ', close=''):
+    """Una cadena por fila de ``rows``: ``open`` + valores separados + ``close``"""
+    rows = np.asarray(rows, dtype=float)
+    if rows.ndim != 2:
+        raise ValueError(f"Se esperaba un arreglo (N, d), se recibió la forma {rows.shape}")
+    n, dim = rows.shape
+    if n == 0:
+        return []
+    digits = digits or SIGNIFICANT_DIGITS
+    matrix = _number_matrix(rows, digits, MAX_DECIMALS).reshape(n, -1)
+    width = matrix.shape[1] // dim
+
+    def column(text):
+        return np.tile(np.frombuffer(text.encode('ascii'), dtype=np.uint8), (n, 1))
+
+    pieces = [column(open)]
+    for j in range(dim):
+        if j:
+            pieces.append(column(sep))
+        pieces.append(matrix[:, j * width:(j + 1) * width])
+    pieces.append(column(close + '\n'))
+    return _join_rows(np.hstack(pieces))
+
+
+def format_points(points, digits=None):
+    """Lista de coordenadas TikZ ``(x,y[,z])``, una por fila de ``points``"""
+    return format_rows(points, digits, open='(', sep=',', close=')')
+
+
+def format_number(value, digits=None):
+    """Un único número formateado como las coordenadas"""
+    return format_numbers([value], digits)[0]
+
+
+def format_tuple(values, max_items=None, digits=None):
+    """
+    ``(a, b, c)``; con más de ``max_items`` componentes, las primeras, ``\\ldots``
+    y las dos últimas
+    """
+    values = np.asarray(values, dtype=float).ravel()
+    max_items = max_items or MAX_SHOWN_COMPONENTS
+    if len(values) <= max_items:
+        return '(' + ', '.join(format_numbers(values, digits)) + ')'
+    head = format_numbers(values[:max_items - 2], digits)
+    tail = format_numbers(values[-2:], digits)
+    return '(' + ', '.join(head + ['\\ldots'] + tail) + ')'
+
+
+def point(*values):
+    """Coordenada TikZ ``(x,y)`` o ``(x,y,z)``"""
+    return format_points([values])[0]
+
+
+class TikZEmitter:
+    """Acumula código TikZ línea a línea y lo une al final"""
+
+    __slots__ = ('_lines', 'indent')
+
+    def __init__(self, indent='    '):
+        self._lines = []
+        self.indent = indent
+
+    def line(self, text):
+        """Añade una línea tal cual"""
+        self._lines.append(text + '\n')
+
+    def lines(self, texts):
+        """Añade varias líneas ya formateadas (p. ej. de una operación vectorizada)"""
+        self._lines.extend([text + '\n' for text in texts])
+
+    def begin(self, environment, options=None):
+        """``\\begin{environment}[options]``"""
+        opts = f'[{options}]' if options else ''
+        self._lines.append(f'\\begin{{{environment}}}{opts}\n')
+
+    def end(self, environment):
+        """``\\end{environment}``"""
+        self._lines.append(f'\\end{{{environment}}}\n')
+
+    def command(self, name, *arguments):
+        """Comando de una línea: ``\\name{a}{b}``"""
+        args = ''.join([f'{{{a}}}' for a in arguments])
+        self._lines.append(f'\\{name}{args}\n')
+
+    def draw(self, options, path):
+        """``\\draw[options] path;``"""
+        self._lines.append(f'{self.indent}\\draw[{options}] {path};\n')
+
+    def fill(self, options, path):
+        """``\\fill[options] path;``"""
+        self._lines.append(f'{self.indent}\\fill[{options}] {path};\n')
+
+    def node(self, options, at, text):
+        """``\\node[options] at (x,y) {text};``"""
+        self._lines.append(f'{self.indent}\\node[{options}] at {at} {{{text}}};\n')
+
+    def addplot(self, options, source, three_d=False):
+        """``\\addplot[options] source;`` de pgfplots (``\\addplot3`` con ``three_d``)"""
+        plot = 'addplot3' if three_d else 'addplot'
+        self._lines.append(f'{self.indent}\\{plot}[{options}] {source};\n')
+
+    def foreach(self, variables, entries, body):
+        """
+        ``\\foreach \\a/\\b in {...}{body}`` con una entrada por línea
+
+        Args:
+            variables: Nombres de las variables sin barra invertida ('vx', 'vy')
+            entries: Cadenas 'a/b' ya formateadas, una por iteración
+            body: Comandos completos del cuerpo, uno por línea
+        """
+        if not entries:
+            return
+        inner = self.indent * 2
+        names = '/'.join([f'\\{v}' for v in variables])
+        self._lines.append(f'{self.indent}\\foreach {names} in {{%\n')
+        self._lines.append(f'{inner}' + f',\n{inner}'.join(entries) + '}{\n')
+        self._lines.extend([f'{inner}{command}\n' for command in body])
+        self._lines.append(f'{self.indent}}}\n')
+
+    def extend(self, other, order=None):
+        """Añade las líneas de otro emisor, en el orden de índices ``order`` si se da"""
+        if order is None:
+            self._lines.extend(other._lines)
+        else:
+            lines = other._lines
+            self._lines.extend([lines[i] for i in np.asarray(order).tolist()])
+
+    def __len__(self):
+        return len(self._lines)
+
+    def getvalue(self):
+        """Código completo"""
+        return ''.join(self._lines)
+
+
+def colormap(n, palette=None):
+    """
+    Un color xcolor por cada uno de ``n`` vectores
+
+    Con ``n`` <= len(palette) se usan los colores de la paleta tal cual. Con
+    más vectores se interpolan mezclas entre colores consecutivos de la
+    paleta (``red!60!green``), con a lo sumo ``MAX_COLORMAP_COLORS``
+    colores distintos asignados en bloques según el orden de los vectores.
+    """
+    palette = list(palette or DEFAULT_PALETTE)
+    if n <= len(palette):
+        return palette[:n]
+    if len(palette) == 1:
+        return palette * n
+    levels = min(n, max(MAX_COLORMAP_COLORS, len(palette)))
+    colors = []
+    for t in np.linspace(0, len(palette) - 1, levels):
+        k = min(int(t), len(palette) - 2)
+        share = int(round(100 * (1 - (t - k))))
+        if share >= 100:
+            colors.append(palette[k])
+        elif share <= 0:
+            colors.append(palette[k + 1])
+        else:
+            colors.append(f'{palette[k]}!{share}!{palette[k + 1]}')
+    return [colors[i * levels // n] for i in range(n)]
+
+
+class StyleRegistry:
+    """
+    Estilos TikZ con nombre corto, uno por cada lista de opciones distinta
+
+    Con ``inline=True`` devuelve las opciones tal cual y no escribe nada:
+    un estilo que se usa una sola vez solo alarga el archivo.
+    """
+
+    __slots__ = ('prefix', 'inline', '_names')
+
+    def __init__(self, prefix='vs', inline=False):
+        self.prefix = prefix
+        self.inline = inline
+        self._names = {}
+
+    @classmethod
+    def for_colors(cls, colors, prefix='vs'):
+        """Registro para una figura con un color por vector (inline si ninguno se repite)"""
+        return cls(prefix, inline=len(set(colors)) == len(colors))
+
+    def __call__(self, options):
+        """Nombre del estilo para ``options`` (se registra la primera vez)"""
+        if self.inline:
+            return options
+        name = self._names.get(options)
+        if name is None:
+            name = self._names[options] = f'{self.prefix}{len(self._names)}'
+        return name
+
+    def __len__(self):
+        return len(self._names)
+
+    def tikzset(self):
+        """``\\tikzset{vs0/.style={...}, ...}`` con todos los estilos registrados"""
+        styles = ', '.join(f'{name}/.style={{{options}}}' for options, name in self._names.items())
+        return f'\\tikzset{{{styles}}}'
+
+    def emit(self, tikz):
+        """Escribe el ``\\tikzset`` en ``tikz`` si hay algún estilo"""
+        if self._names:
+            tikz.line(tikz.indent + self.tikzset())
+
+
+class ColorRegistry(StyleRegistry):
+    """
+    Colores xcolor con nombre corto (``\\colorlet{vc0}{red!60!green}``)
+
+    Para las figuras con ``\\foreach``: el cuerpo ya escribe las opciones
+    una sola vez, lo que se repite por vector es el color de cada entrada.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def for_colors(cls, colors, prefix='vc'):
+        return super().for_colors(colors, prefix)
+
+    def emit(self, tikz):
+        """Escribe un ``\\colorlet`` por color registrado en ``tikz``"""
+        tikz.lines([f'{tikz.indent}\\colorlet{{{name}}}{{{color}}}'
+                    for color, name in self._names.items()])
+
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Agregación por densidad para conjuntos de millones de vectores
+
+Ningún dibujo con una flecha por vector es viable con millones de vectores.
+Estas funciones reducen el conjunto a histogramas de tamaño fijo (extremos
+en una rejilla o direcciones por sectores) recorriéndolo por bloques de
+``chunk_size`` filas (``vector_io.CHUNK_SIZE`` por defecto), de modo que la
+memoria no depende de N. Funcionan con arreglos en memoria, con
+``np.memmap`` y con las fuentes por bloques de ``vector_io`` (CSVVectors).
+"""
+
+import numpy as np
+
+import vector_io
+
+
+def iter_chunks(data, columns, chunk_size=None):
+    """Bloques (k, len(columns)) de ``data`` convertidos a float"""
+    for block in vector_io.iter_chunks(data, chunk_size):
+        yield block[:, columns]
+
+
+def extent(data, columns=(0, 1), chunk_size=None):
+    """(mínimos, máximos) por columna, en una pasada por bloques"""
+    lo = np.full(len(columns), np.inf)
+    hi = np.full(len(columns), -np.inf)
+    for block in iter_chunks(data, list(columns), chunk_size):
+        if len(block):
+            lo = np.minimum(lo, block.min(axis=0))
+            hi = np.maximum(hi, block.max(axis=0))
+    return lo, hi
+
+
+def endpoint_histogram(data, bins=64, columns=(0, 1), chunk_size=None):
+    """
+    Histograma 2D de los extremos de los vectores
+
+    Devuelve (conteos[bins_x, bins_y], bordes_x, bordes_y). Hace dos
+    pasadas por bloques: una para el rango y otra para contar.
+    """
+    lo, hi = extent(data, columns, chunk_size)
+    if not np.isfinite(lo).all():
+        lo, hi = np.zeros(2), np.ones(2)
+    hi = np.where(hi > lo, hi, lo + 1.0)  # evita rangos vacíos
+    x_edges = np.linspace(lo[0], hi[0], bins + 1)
+    y_edges = np.linspace(lo[1], hi[1], bins + 1)
+    counts = np.zeros((bins, bins), dtype=np.int64)
+    for block in iter_chunks(data, list(columns), chunk_size):
+        block_counts, _, _ = np.histogram2d(block[:, 0], block[:, 1], bins=[x_edges, y_edges])
+        counts += block_counts.astype(np.int64)
+    return counts, x_edges, y_edges
+
+
+def direction_histogram(data, bins=36, columns=(0, 1), chunk_size=None):
+    """
+    Histograma de direcciones en el plano (ángulo con el eje x)
+
+    Devuelve (conteos[bins], bordes en radianes de -pi a pi). Los vectores
+    nulos no tienen dirección y se ignoran.
+    """
+    edges = np.linspace(-np.pi, np.pi, bins + 1)
+    counts = np.zeros(bins, dtype=np.int64)
+    for block in iter_chunks(data, list(columns), chunk_size):
+        block = block[(block != 0).any(axis=1)]
+        angles = np.arctan2(block[:, 1], block[:, 0])
+        counts += np.histogram(angles, bins=edges)[0]
+    return counts, edges
+
+
+def sample_rows(data, k, seed=0, chunk_size=None):
+    """
+    ``k`` filas elegidas al azar sin reemplazo (en orden de aparición)
+
+    Las fuentes sin acceso aleatorio (CSVVectors) se recorren por bloques.
+    """
+    n = len(data)
+    if k <= 0 or n == 0:
+        return np.zeros((0, vector_io.dimension(data)))
+    index = np.sort(np.random.default_rng(seed).choice(n, size=min(k, n), replace=False))
+    if not hasattr(data, 'chunks'):
+        return np.asarray(data[index], dtype=float)
+    picked = []
+    start = 0
+    for block in vector_io.iter_chunks(data, chunk_size):
+        lo, hi = np.searchsorted(index, [start, start + len(block)])
+        picked.append(block[index[lo:hi] - start])
+        start += len(block)
+    return np.concatenate(picked)
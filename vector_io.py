@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""
+Carga de conjuntos de vectores desde disco, por bloques
+
+Los loaders no leen el archivo completo en memoria:
+
+- ``load_npy`` y ``load_binary`` devuelven un ``np.memmap`` (N, d); el
+  sistema operativo pagina los datos a medida que se recorren.
+- ``load_csv`` devuelve un ``CSVVectors``, que relee el archivo y lo
+  convierte de ``chunk_size`` en ``chunk_size`` líneas cada vez que se
+  recorre.
+
+``iter_chunks`` recorre cualquiera de ellos (o un arreglo en memoria) como
+bloques (k, d) de float con k <= ``chunk_size``, así que la memoria pico es
+proporcional al tamaño del bloque y no al del conjunto. VectorSpace3D
+acepta estas fuentes directamente en ``add_vector_2d`` / ``add_vector_3d``,
+y ``VectorBatch2D.iter_chunks`` / ``VectorBatch3D.iter_chunks`` las
+convierten en lotes para operar con ellos.
+
+Ejemplo::
+
+    datos = load_vectors('viento.csv', columns=('u', 'v'))
+    vs.add_vector_2d(datos, backend='heatmap')
+    for lote in VectorBatch2D.iter_chunks(datos):
+        total += lote.magnitude().sum()
+"""
+
+import itertools
+import os
+
+import numpy as np
+
+# Filas por bloque al recorrer un conjunto de vectores
+CHUNK_SIZE = 1_000_000
+
+_BINARY_EXTENSIONS = ('.bin', '.raw', '.f32', '.f64')
+
+
+def load_npy(path):
+    """Arreglo (N, d) de un .npy mapeado en memoria (solo lectura)"""
+    data = np.load(path, mmap_mode='r')
+    if data.ndim != 2:
+        raise ValueError(f"{path}: se esperaba un arreglo (N, d), la forma es {data.shape}")
+    return data
+
+
+def load_binary(path, dim, dtype='<f8', offset=0):
+    """
+    Arreglo (N, dim) mapeado en memoria de un archivo binario crudo
+
+    Args:
+        path: Archivo con los valores seguidos, fila a fila
+        dim: Componentes por vector
+        dtype: Tipo de los valores ('<f8' float64, '<f4' float32...)
+        offset: Bytes de cabecera que se saltan al inicio
+    """
+    dtype = np.dtype(dtype)
+    size = os.path.getsize(path) - offset
+    row_bytes = dtype.itemsize * dim
+    if size < 0 or size % row_bytes:
+        raise ValueError(f"{path}: {size} bytes no son un número entero de vectores "
+                         f"de {dim} × {dtype.itemsize} bytes")
+    if size == 0:
+        return np.zeros((0, dim), dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=(size // row_bytes, dim))
+
+
+def load_csv(path, columns=None, delimiter=',', skip_header=None):
+    """Conjunto de vectores de un CSV, recorrido por bloques (ver CSVVectors)"""
+    return CSVVectors(path, columns, delimiter, skip_header)
+
+
+def load_vectors(path, **kwargs):
+    """
+    Elige el loader por la extensión: .npy, .csv / .txt o binario crudo
+
+    Los binarios (.bin, .raw, .f32, .f64) necesitan ``dim``; con .f32 el
+    tipo por defecto es float32.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.npy':
+        return load_npy(path)
+    if extension in ('.csv', '.txt'):
+        return load_csv(path, **kwargs)
+    if extension in _BINARY_EXTENSIONS:
+        if extension == '.f32':
+            kwargs.setdefault('dtype', '<f4')
+        return load_binary(path, **kwargs)
+    raise ValueError(f"{path}: formato desconocido (use .npy, .csv, .txt o "
+                     f"{', '.join(_BINARY_EXTENSIONS)})")
+
+
+def _is_number(field):
+    try:
+        float(field)
+    except ValueError:
+        return False
+    return True
+
+
+class CSVVectors:
+    """
+    Vectores de un archivo CSV que se leen por bloques al recorrerlos
+
+    No guarda los datos: cada recorrido (``chunks``) vuelve a leer el
+    archivo. ``len`` cuenta las filas en una pasada la primera vez.
+    """
+
+    def __init__(self, path, columns=None, delimiter=',', skip_header=None):
+        """
+        Args:
+            path: Ruta del CSV
+            columns: Columnas que forman cada vector, por índice o por
+                nombre de la cabecera (por defecto, todas)
+            delimiter: Separador de campos (None: espacios en blanco)
+            skip_header: Líneas de cabecera; None la detecta si la primera
+                línea no es numérica
+        """
+        self.path = path
+        self.delimiter = delimiter
+        self._length = None
+
+        first = self._first_line()
+        fields = [f.strip() for f in first.split(delimiter)]
+        if skip_header is None:
+            skip_header = int(bool(first) and not all(_is_number(f) for f in fields))
+        self.skip_header = skip_header
+
+        if columns is not None:
+            columns = [fields.index(c) if isinstance(c, str) else c for c in columns]
+        self.columns = columns
+        self.dim = len(columns) if columns is not None else len(fields)
+
+    def _first_line(self):
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip() and not line.lstrip().startswith('#'):
+                    return line.strip()
+        return ''
+
+    @property
+    def shape(self):
+        return (len(self), self.dim)
+
+    def __len__(self):
+        if self._length is None:
+            with open(self.path, encoding='utf-8') as f:
+                rows = sum(1 for line in f if line.strip() and not line.lstrip().startswith('#'))
+            self._length = rows - self.skip_header
+        return self._length
+
+    def chunks(self, chunk_size=None):
+        """Bloques (k, dim) de float, k <= ``chunk_size``"""
+        chunk_size = chunk_size or CHUNK_SIZE
+        with open(self.path, encoding='utf-8') as f:
+            lines = (line for line in f if line.strip() and not line.lstrip().startswith('#'))
+            for _ in itertools.islice(lines, self.skip_header):
+                pass
+            while True:
+                block = list(itertools.islice(lines, chunk_size))
+                if not block:
+                    return
+                yield np.loadtxt(block, delimiter=self.delimiter, usecols=self.columns,
+                                 ndmin=2, dtype=float)
+
+    def __repr__(self):
+        return f"CSVVectors({self.path!r}, dim={self.dim})"
+
+
+def iter_chunks(source, chunk_size=None):
+    """
+    Bloques (k, d) de float de un arreglo, memmap, CSVVectors o lista de tuplas
+
+    Solo el bloque actual se convierte a float en memoria.
+    """
+    chunk_size = chunk_size or CHUNK_SIZE
+    if hasattr(source, 'chunks'):
+        yield from source.chunks(chunk_size)
+        return
+    data = as_rows(source)
+    for start in range(0, len(data), chunk_size):
+        yield np.asarray(data[start:start + chunk_size], dtype=float)
+
+
+def as_rows(vectors):
+    """Arreglo (N, d) sin copiar arreglos, memmaps ni fuentes por bloques"""
+    if hasattr(vectors, 'chunks') or (hasattr(vectors, 'shape') and hasattr(vectors, 'dtype')):
+        return vectors
+    return np.asarray(vectors, dtype=float)
+
+
+def as_array(source):
+    """Fuente indexable fila a fila tal cual; una fuente por bloques se lee completa"""
+    if hasattr(source, 'chunks'):
+        blocks = list(source.chunks())
+        return np.concatenate(blocks) if blocks else np.zeros((0, source.dim))
+    return source
+
+
+def dimension(source):
+    """Componentes por vector de cualquier fuente"""
+    if hasattr(source, 'chunks'):
+        return source.dim
+    if hasattr(source, 'shape'):
+        return source.shape[1]
+    return len(source[0])
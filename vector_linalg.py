@@ -0,0 +1,423 @@
+# -*- coding: utf-8 -*-
+"""
+Álgebra lineal por lotes para AdvancedVectorSpace
+
+Los métodos de AdvancedVectorSpace operaban vector a vector con bucles de
+Python. Aquí las mismas operaciones trabajan sobre la matriz (k, d) con un
+vector por fila y delegan en LAPACK:
+
+- ``orthonormalize`` calcula la base de Gram-Schmidt con una factorización
+  QR (``np.linalg.qr``), que da la misma base salvo el signo de cada vector
+  (se corrige con el de la diagonal de R). Si algún vector depende de los
+  anteriores la QR le asigna una dirección arbitraria, así que en ese caso
+  se usa ``modified_gram_schmidt``, que detecta el rango: un vector cuyo
+  residuo es menor que ``tol`` veces su norma se descarta.
+- ``projector`` factoriza una base una sola vez y guarda el ``Projector``
+  en caché según el contenido de la base; proyectar un lote (N, d) son dos
+  productos de matrices, correctos aunque la base no sea ortogonal.
+- ``RankAnalysis`` calcula con una SVD el rango, el número de condición y
+  las relaciones de dependencia de k vectores de R^d, con cualquier k y d.
+- ``eigenpairs`` usa ``np.linalg.eigh`` si la matriz es simétrica
+  (hermítica) y, si solo se piden los k valores propios dominantes de una
+  matriz simétrica grande, iteración de subespacios (un producto
+  matriz-bloque por iteración en vez de la factorización completa), que
+  recurre a ``eigh`` en cuanto estima que no convergería a tiempo.
+- ``IncrementalBasis`` es un ``Projector`` que crece vector a vector: cada
+  vector nuevo se ortogonaliza contra la base actual en O(d·k) y las
+  consultas no necesitan refactorizar nada.
+"""
+
+import functools
+import math
+
+import numpy as np
+
+# Holgura sobre max(k, d) × épsilon para el error de redondeo acumulado
+TOL_FACTOR = 100
+
+# Bases distintas cuyos proyectores se guardan en caché
+PROJECTOR_CACHE_SIZE = 64
+
+# Iteración de subespacios solo desde este tamaño y con k <= n / TOP_K_RATIO
+# (por debajo, eigh completo es más rápido)
+SUBSPACE_MIN_SIZE = 200
+TOP_K_RATIO = 8
+
+# Columnas extra del bloque de la iteración de subespacios
+SUBSPACE_OVERSAMPLE = 20
+
+# Residuo ‖A x - λ x‖ / |λ_max| de convergencia de la iteración de subespacios
+SUBSPACE_TOL = 1e-8
+
+# Iteraciones con las que se mide la velocidad de convergencia
+RATE_WINDOW = 4
+
+
+def as_matrix(vectors):
+    """Matriz (k, d) de float con un vector por fila"""
+    matrix = np.asarray(vectors, dtype=float)
+    if matrix.ndim != 2:
+        raise ValueError(f"Se esperaba una lista de vectores (k, d), la forma es {matrix.shape}")
+    return matrix
+
+
+def default_tol(shape):
+    """Tolerancia relativa por defecto para una matriz de forma ``shape``"""
+    return max(shape) * np.finfo(float).eps * TOL_FACTOR
+
+
+def orthonormalize(vectors, tol=None):
+    """
+    Base ortonormal de Gram-Schmidt de los vectores, en orden
+
+    Returns:
+        (Q (r, d) con los vectores ortonormales por filas,
+         índices (r,) de los vectores de entrada que aportan cada uno)
+    """
+    matrix = as_matrix(vectors)
+    k, d = matrix.shape
+    tol = default_tol(matrix.shape) if tol is None else tol
+    if 0 < k <= d:
+        q, r = np.linalg.qr(matrix.T)
+        diag = np.diag(r)
+        if np.all(np.abs(diag) > tol * np.linalg.norm(matrix, axis=1)):
+            return q.T * np.where(diag < 0, -1.0, 1.0)[:, None], np.arange(k)
+    return modified_gram_schmidt(matrix, tol)
+
+
+def modified_gram_schmidt(vectors, tol=None):
+    """
+    Gram-Schmidt modificado con detección de rango
+
+    Cada vector aceptado se resta de todos los siguientes a la vez (una
+    operación de matriz por vector). Devuelve lo mismo que ``orthonormalize``.
+    """
+    residual = as_matrix(vectors).copy()
+    k, d = residual.shape
+    tol = default_tol(residual.shape) if tol is None else tol
+    norms = np.linalg.norm(residual, axis=1)
+    basis = []
+    kept = []
+    for j in range(k):
+        if len(basis) == d:
+            break
+        norm = np.linalg.norm(residual[j])
+        if norm <= tol * norms[j]:
+            continue
+        q = residual[j] / norm
+        rest = residual[j + 1:]
+        rest -= np.outer(rest @ q, q)
+        basis.append(q)
+        kept.append(j)
+    if not basis:
+        return np.zeros((0, d)), np.zeros(0, dtype=int)
+    return np.array(basis), np.array(kept)
+
+
+def is_symmetric(matrix, tol=None):
+    """True si la matriz es cuadrada e igual a su traspuesta conjugada"""
+    matrix = np.asarray(matrix)
+    if matrix.ndim != 2 or matrix.shape[0] != matrix.shape[1]:
+        return False
+    tol = default_tol(matrix.shape) if tol is None else tol
+    scale = np.abs(matrix).max(initial=0.0)
+    return bool(np.abs(matrix - matrix.conj().T).max(initial=0.0) <= tol * scale)
+
+
+def eigenpairs(matrix, k=None, symmetric=None, tol=None, max_iter=None):
+    """
+    Valores y vectores propios, los ``k`` de mayor valor absoluto (o todos)
+
+    Args:
+        matrix: Matriz cuadrada (n, n)
+        k: Pares que se devuelven (None: todos)
+        symmetric: None lo detecta con ``is_symmetric``
+        tol: Residuo relativo de convergencia de la iteración de subespacios
+            (``SUBSPACE_TOL`` por defecto)
+        max_iter: Iteraciones máximas de la iteración de subespacios (ver
+            ``subspace_iteration``)
+
+    Returns:
+        (valores (k,), vectores (n, k) por columnas, symmetric), ordenados
+        de mayor a menor valor absoluto
+    """
+    matrix = np.asarray(matrix)
+    if matrix.ndim != 2 or matrix.shape[0] != matrix.shape[1]:
+        raise ValueError(f"Se esperaba una matriz cuadrada, la forma es {matrix.shape}")
+    n = matrix.shape[0]
+    k = n if k is None else max(0, min(k, n))
+    if symmetric is None:
+        symmetric = is_symmetric(matrix)
+    if symmetric and n >= SUBSPACE_MIN_SIZE and k * TOP_K_RATIO <= n:
+        values, vectors = subspace_iteration(matrix, k, tol, max_iter)
+        return values, vectors, True
+    if symmetric:
+        values, vectors = np.linalg.eigh(matrix)
+    else:
+        values, vectors = np.linalg.eig(matrix)
+    order = np.argsort(-np.abs(values), kind='stable')[:k]
+    return values[order], vectors[:, order], symmetric
+
+
+def subspace_iteration(matrix, k, tol=None, max_iter=None, seed=0):
+    """
+    Los ``k`` pares propios dominantes de una matriz simétrica
+
+    Iteración de subespacios con un bloque de k + max(k, ``SUBSPACE_OVERSAMPLE``)
+    columnas y Rayleigh-Ritz en cada paso. Converge cuando el residuo
+    ‖A x - λ x‖ de los k pares es menor que ``tol`` · |λ_max|; el error de
+    los valores propios es entonces del orden de tol² · ‖A‖² / separación.
+
+    Cada iteración cuesta un producto (n, n) × (n, bloque), así que
+    ``max_iter`` (por defecto n / bloque) iteraciones cuestan lo mismo que
+    un ``eigh`` completo. La velocidad de convergencia se estima en cada
+    paso (con los valores de Ritz y, tras ``RATE_WINDOW`` pasos, con los
+    residuos medidos): si no alcanzaría ``tol`` dentro de ese presupuesto,
+    por ejemplo con un espectro sin separación, se pasa a ``eigh`` enseguida.
+    """
+    n = matrix.shape[0]
+    dtype = np.result_type(matrix.dtype, float)
+    if k == 0:
+        return np.zeros(0), np.zeros((n, 0), dtype=dtype)
+    tol = tol or SUBSPACE_TOL
+    block = min(n, k + max(k, SUBSPACE_OVERSAMPLE))
+    max_iter = max_iter or max(n // block, 10)
+    tiny = np.finfo(float).tiny
+    rng = np.random.default_rng(seed)
+    q, _ = np.linalg.qr(rng.standard_normal((n, block)).astype(dtype))
+    history = []
+    for step in range(1, max_iter + 1):
+        z = matrix @ q
+        values, ritz = np.linalg.eigh(q.conj().T @ z)
+        order = np.argsort(-np.abs(values), kind='stable')
+        values, ritz = values[order], ritz[:, order]
+        vectors = q @ ritz
+        residual = np.linalg.norm(z @ ritz[:, :k] - vectors[:, :k] * values[:k], axis=0)
+        residual = residual.max() / max(abs(values[0]), tiny)
+        if residual <= tol:
+            return values[:k], vectors[:, :k]
+
+        # Velocidad: |λ_bloque / λ_k| y, con historia, la reducción medida
+        history.append(residual)
+        rate = max(abs(values[-1]) / max(abs(values[k - 1]), tiny), tiny)
+        if len(history) > RATE_WINDOW:
+            rate = max(rate, (history[-1] / history[-1 - RATE_WINDOW]) ** (1 / RATE_WINDOW))
+        if rate >= 1 or step + math.log(tol / residual) / math.log(rate) > max_iter:
+            break
+        q, _ = np.linalg.qr(z @ ritz)
+    values, vectors = np.linalg.eigh(matrix)
+    order = np.argsort(-np.abs(values), kind='stable')[:k]
+    return values[order], vectors[:, order]
+
+
+class RankAnalysis:
+    """
+    Rango, condición y dependencias de un conjunto de vectores, por SVD
+
+    ``tol`` es absoluta sobre los valores singulares; por defecto
+    σ_max · max(k, d) · ε, el mismo criterio que ``np.linalg.matrix_rank``.
+    Solo se guarda la SVD reducida (memoria O(k·d)); ``null_space`` calcula
+    las relaciones de dependencia cuando se piden.
+    """
+
+    __slots__ = ('shape', 'singular_values', 'tol', 'rank', '_range')
+
+    def __init__(self, vectors, tol=None):
+        matrix = as_matrix(vectors)
+        k, d = matrix.shape
+        self.shape = matrix.shape
+        u, s, _ = np.linalg.svd(matrix, full_matrices=False)
+        self.singular_values = s
+        if tol is None:
+            tol = s.max(initial=0.0) * max(k, d) * np.finfo(float).eps
+        self.tol = tol
+        self.rank = int(np.count_nonzero(s > tol))
+        # Base ortonormal (k, rank) del espacio columna de A
+        self._range = u[:, :self.rank]
+
+    @property
+    def nullity(self):
+        """Número de relaciones de dependencia independientes, k - rango"""
+        return self.shape[0] - self.rank
+
+    def null_space(self, count=None):
+        """
+        Relaciones de dependencia: filas c ortonormales con Σ c_i v_i ≈ 0
+
+        Con ``count`` se devuelven solo las primeras ``count`` (memoria
+        O(k·(count + rango))); sin él, una base completa del núcleo de Aᵀ
+        (A = vectores por filas), de tamaño (k - rango, k).
+        """
+        k = self.shape[0]
+        if count is None or count >= self.nullity:
+            if self.rank == 0:
+                return np.eye(k)
+            u = np.linalg.svd(self._range, full_matrices=True)[0]
+            return u[:, self.rank:].T
+        if count <= 0:
+            return np.zeros((0, k))
+        # Vectores canónicos menos alineados con el espacio columna, sin su
+        # proyección sobre él: de count + rango salen al menos count independientes
+        leverage = np.einsum('ij,ij->i', self._range, self._range)
+        chosen = np.argsort(leverage, kind='stable')[:count + self.rank]
+        candidates = -self._range[chosen] @ self._range.T
+        candidates[np.arange(len(chosen)), chosen] += 1.0
+        candidates -= (candidates @ self._range) @ self._range.T
+        basis, _ = modified_gram_schmidt(candidates)
+        return basis[:count]
+
+    @property
+    def condition(self):
+        """σ_max / σ_min (infinito si los vectores son dependientes)"""
+        if not self.independent:
+            return np.inf
+        s = self.singular_values
+        return float(s[0] / s[-1])
+
+    @property
+    def independent(self):
+        return self.rank == self.shape[0]
+
+    @property
+    def spans(self):
+        """True si los vectores generan todo R^d"""
+        return self.rank == self.shape[1]
+
+    def __repr__(self):
+        return f"RankAnalysis(rank={self.rank}, shape={self.shape}, condition={self.condition:.4g})"
+
+
+class Projector:
+    """Proyección ortogonal sobre el subespacio generado por una base"""
+
+    __slots__ = ('basis', 'kept', 'tol')
+
+    def __init__(self, basis, tol=None):
+        """
+        Args:
+            basis: Vectores (k, d) que generan el subespacio (no hace falta
+                que sean ortogonales ni independientes)
+            tol: Tolerancia relativa de ``orthonormalize`` y ``contains``
+        """
+        matrix = as_matrix(basis)
+        self.tol = default_tol(matrix.shape) if tol is None else tol
+        self.basis, self.kept = orthonormalize(matrix, self.tol)
+        self.basis.flags.writeable = False
+
+    @property
+    def rank(self):
+        """Dimensión del subespacio"""
+        return self.basis.shape[0]
+
+    @property
+    def dim(self):
+        """Dimensión del espacio ambiente"""
+        return self.basis.shape[1]
+
+    def coordinates(self, vectors):
+        """Coordenadas (N, rank) en la base ortonormal de los vectores (N, d)"""
+        return np.asarray(vectors, dtype=float) @ self.basis.T
+
+    def project(self, vectors):
+        """Proyecciones (N, d) de los vectores (N, d) (o (d,) de uno solo)"""
+        return self.coordinates(vectors) @ self.basis
+
+    def residual(self, vectors):
+        """Componentes ortogonales al subespacio, v - proj(v)"""
+        vectors = np.asarray(vectors, dtype=float)
+        return vectors - self.project(vectors)
+
+    def contains(self, vectors):
+        """True por cada vector cuyo residuo es menor que ``tol`` veces su norma"""
+        vectors = np.asarray(vectors, dtype=float)
+        residual = np.linalg.norm(self.residual(vectors), axis=-1)
+        return residual <= self.tol * np.linalg.norm(vectors, axis=-1)
+
+    def matrix(self):
+        """Matriz (d, d) del proyector, P = Q Qᵀ"""
+        return self.basis.T @ self.basis
+
+    def __repr__(self):
+        return f"Projector(rank={self.rank}, dim={self.dim})"
+
+
+def projector(basis, tol=None):
+    """``Projector`` de la base, factorizado una sola vez por contenido"""
+    matrix = np.ascontiguousarray(as_matrix(basis))
+    return _cached_projector(matrix.shape, matrix.tobytes(), tol)
+
+
+@functools.lru_cache(maxsize=PROJECTOR_CACHE_SIZE)
+def _cached_projector(shape, data, tol):
+    return Projector(np.frombuffer(data).reshape(shape), tol)
+
+
+class IncrementalBasis(Projector):
+    """
+    Base ortonormal que crece a medida que llegan vectores
+
+    ``append`` resta al vector nuevo su proyección sobre la base actual
+    (Gram-Schmidt clásico con una segunda pasada de reortogonalización,
+    O(d·k)) y lo añade si el residuo supera ``tol`` veces su norma. Las
+    filas (y sus índices en ``kept``) se guardan en búferes que duplican su
+    tamaño al llenarse; ``basis`` y ``kept`` son arreglos de solo lectura,
+    como en ``Projector``, y sus consultas (``project``, ``residual``,
+    ``contains``...) usan siempre la base actual.
+    """
+
+    __slots__ = ('count', '_buffer', '_kept')
+
+    def __init__(self, dim, vectors=None, tol=None):
+        """
+        Args:
+            dim: Dimensión del espacio ambiente
+            vectors: Vectores iniciales (opcional)
+            tol: Tolerancia relativa para descartar vectores dependientes
+        """
+        super().__init__(np.zeros((0, dim)), tol)
+        self.count = 0
+        self._buffer = np.zeros((min(dim, 8), dim))
+        self._kept = np.zeros(len(self._buffer), dtype=self.kept.dtype)
+        self._set_rank(0)
+        if vectors is not None:
+            self.extend(vectors)
+
+    def append(self, vector):
+        """Añade un vector; devuelve False si depende de la base actual"""
+        v = np.asarray(vector, dtype=float).reshape(-1)
+        if v.shape[0] != self.dim:
+            raise ValueError(f"Se esperaba un vector de dimensión {self.dim}, "
+                             f"se recibió uno de dimensión {v.shape[0]}")
+        index = self.count
+        self.count += 1
+        rank = self.rank
+        norm = np.linalg.norm(v)
+        if rank == self.dim or norm == 0:
+            return False
+        u = v - self.project(v)
+        u -= self.project(u)
+        residual = np.linalg.norm(u)
+        if residual <= self.tol * norm:
+            return False
+        if rank == len(self._buffer):
+            size = min(2 * rank, self.dim)
+            self._buffer = np.concatenate([self._buffer, np.zeros((size - rank, self.dim))])
+            self._kept = np.concatenate([self._kept, np.zeros(size - rank, dtype=self._kept.dtype)])
+        self._buffer[rank] = u / residual
+        self._kept[rank] = index
+        self._set_rank(rank + 1)
+        return True
+
+    def _set_rank(self, rank):
+        """``basis`` y ``kept`` como vistas de solo lectura de los búferes"""
+        self.basis = self._buffer[:rank]
+        self.basis.flags.writeable = False
+        self.kept = self._kept[:rank]
+        self.kept.flags.writeable = False
+
+    def extend(self, vectors):
+        """Añade varios vectores (k, d); devuelve qué vectores se añadieron"""
+        return np.array([self.append(v) for v in as_matrix(vectors)], dtype=bool)
+
+    def __repr__(self):
+        return f"IncrementalBasis(rank={self.rank}, dim={self.dim}, count={self.count})"
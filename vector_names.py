@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""
+Nombres simbólicos perezosos para los vectores
+
+Los operadores de Vector2D/Vector3D ya no concatenan cadenas: construyen un
+árbol de expresión que solo se convierte a LaTeX cuando un documento lo
+necesita (``str``, ``format`` o un f-string). Así ``sum(fuerzas)`` es lineal
+en tiempo y memoria, y una cadena larga ``F_1+F_2+...+F_n`` puede colapsarse
+opcionalmente en ``\\sum_{i=1}^{n} F_i``.
+
+``pickle`` y ``copy.deepcopy`` tampoco recorren el árbol recursivamente: se
+serializa como una lista plana en notación postfija, así que una suma de
+decenas de miles de vectores se puede enviar a otro proceso.
+
+>>> import pickle
+>>> total = 'F_1'
+>>> for i in range(2, 50001):
+...     total = name_add(total, f'F_{i}')
+>>> pickle.loads(pickle.dumps(total)) == total
+True
+"""
+
+import re
+
+_INDEXED = re.compile(r'^(.*[^_])_(?:\{(\d+)\}|(\d+))$')
+
+
+class NameExpr:
+    """Nodo base del árbol de nombres; se renderiza a LaTeX bajo demanda"""
+
+    __slots__ = ('_cache',)
+
+    # Número mínimo de términos a partir del cual una suma F_1+...+F_n
+    # se muestra como \sum_{i=1}^{n} F_i. None desactiva el colapso.
+    collapse_after = None
+
+    def render(self, collapse_after=None):
+        """Devuelve la representación LaTeX del nombre"""
+        if collapse_after is None:
+            collapse_after = NameExpr.collapse_after
+        try:
+            threshold, text = self._cache
+            if threshold == collapse_after:
+                return text
+        except AttributeError:
+            pass
+        text = _render(self, collapse_after)
+        self._cache = (collapse_after, text)
+        return text
+
+    def __str__(self):
+        return self.render()
+
+    def __format__(self, spec):
+        return format(self.render(), spec)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.render()!r})"
+
+    def __eq__(self, other):
+        if isinstance(other, (str, NameExpr)):
+            return self.render() == str(other)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.render())
+
+    def __reduce__(self):
+        return _rebuild, (_flatten(self),)
+
+
+class BinaryName(NameExpr):
+    """Operación binaria entre dos nombres: ``a+b``, ``a-b``, ``a\\times b``"""
+
+    __slots__ = ('op', 'left', 'right')
+
+    def __init__(self, op, left, right):
+        self.op = op
+        self.left = left
+        self.right = right
+
+
+class ScaledName(NameExpr):
+    """Múltiplo escalar de un nombre: ``2u``"""
+
+    __slots__ = ('scalar', 'operand')
+
+    def __init__(self, scalar, operand):
+        self.scalar = scalar
+        self.operand = operand
+
+
+class HatName(NameExpr):
+    """Vector unitario: ``\\hat{u}``"""
+
+    __slots__ = ('operand',)
+
+    def __init__(self, operand):
+        self.operand = operand
+
+
+def name_add(left, right):
+    return BinaryName('+', left, right)
+
+
+def name_sub(left, right):
+    return BinaryName('-', left, right)
+
+
+def name_cross(left, right):
+    return BinaryName('\\times', left, right)
+
+
+def name_scale(scalar, operand):
+    return ScaledName(scalar, operand)
+
+
+def name_hat(operand):
+    return HatName(operand)
+
+
+def _sum_terms(node):
+    """Términos de una cadena de sumas, recorrida sin recursión"""
+    terms = []
+    stack = [node]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, BinaryName) and item.op == '+':
+            stack.append(item.right)
+            stack.append(item.left)
+        else:
+            terms.append(item)
+    return terms
+
+
+def _flatten(root):
+    """
+    Árbol como lista postfija de (clase, valor), sin recursión
+
+    Es el recorrido en preorden (nodo, izquierdo, derecho) invertido: al
+    reconstruirlo, el hijo izquierdo queda encima del derecho en la pila.
+    """
+    code = []
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, BinaryName):
+            code.append((BinaryName, node.op))
+            stack.append(node.right)
+            stack.append(node.left)
+        elif isinstance(node, ScaledName):
+            code.append((ScaledName, node.scalar))
+            stack.append(node.operand)
+        elif isinstance(node, HatName):
+            code.append((HatName, None))
+            stack.append(node.operand)
+        else:
+            code.append((None, node))
+    code.reverse()
+    return code
+
+
+def _rebuild(code):
+    """Árbol a partir de la lista de ``_flatten``"""
+    stack = []
+    for kind, value in code:
+        if kind is BinaryName:
+            left = stack.pop()
+            stack.append(BinaryName(value, left, stack.pop()))
+        elif kind is ScaledName:
+            stack.append(ScaledName(value, stack.pop()))
+        elif kind is HatName:
+            stack.append(HatName(stack.pop()))
+        else:
+            stack.append(value)
+    return stack.pop()
+
+
+def _collapse(terms):
+    r"""``\sum_{i=a}^{b} F_i`` si los términos son F_a, ..., F_b consecutivos"""
+    base = None
+    first = None
+    for k, term in enumerate(terms):
+        if not isinstance(term, str):
+            return None
+        match = _INDEXED.match(term)
+        if match is None:
+            return None
+        index = int(match.group(2) or match.group(3))
+        if base is None:
+            base, first = match.group(1), index
+        elif match.group(1) != base or index != first + k:
+            return None
+    return f"\\sum_{{i={first}}}^{{{first + len(terms) - 1}}} {base}_i"
+
+
+def _render(root, collapse_after):
+    """Renderiza el árbol con una pila explícita (sin límite de recursión)"""
+    pieces = []
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, BinaryName):
+            if node.op == '+' and collapse_after is not None:
+                terms = _sum_terms(node)
+                collapsed = len(terms) >= collapse_after and _collapse(terms)
+                if collapsed:
+                    pieces.append(collapsed)
+                    continue
+                for k in range(len(terms) - 1, 0, -1):
+                    stack.append(terms[k])
+                    stack.append('+')
+                stack.append(terms[0])
+            else:
+                stack.append(node.right)
+                stack.append(node.op)
+                stack.append(node.left)
+        elif isinstance(node, ScaledName):
+            stack.append(node.operand)
+            pieces.append(str(node.scalar))
+        elif isinstance(node, HatName):
+            stack.append('}')
+            stack.append(node.operand)
+            pieces.append('\\hat{')
+        else:
+            pieces.append(str(node))
+    return ''.join(pieces)
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+VectorND: vector de dimensión arbitraria respaldado por NumPy
+
+Unifica los dos modelos de vector del proyecto:
+
+- Se comporta como Vector2D/Vector3D (``x``, ``y``, ``z``, ``name``,
+  ``magnitude()``, ``to_latex()``...) para ``VectorDocument``.
+- Se comporta como tupla (``len``, índices, iteración) y expone su arreglo
+  por ``__array__`` sin copiarlo, para ``VectorSpace3D`` y
+  ``AdvancedVectorSpace``.
+- Opera con Vector2D/Vector3D de la misma dimensión (``VectorND + Vector2D``
+  y ``Vector2D + VectorND``).
+
+``VectorDocument.add_vector`` y ``VectorSpace3D.add_vectors`` eligen el
+dibujo 2D o 3D según la dimensión.
+"""
+
+import math
+
+import numpy as np
+
+from tikz_emitter import format_numbers
+from vector_names import name_add, name_sub, name_scale, name_cross, name_hat
+
+
+def _as_data(other):
+    """Componentes de otro vector (VectorND, Vector2D/3D o secuencia) como arreglo"""
+    if isinstance(other, VectorND):
+        return other.data
+    if hasattr(other, '_components'):
+        other = other._components()
+    return np.asarray(other, dtype=float)
+
+
+class VectorND:
+    """Vector en R^n respaldado por un arreglo de NumPy de una dimensión"""
+
+    __slots__ = ('data', 'name')
+
+    def __init__(self, components, name="v"):
+        if hasattr(components, '_components'):
+            components = components._components()
+        data = np.asarray(components, dtype=float)
+        if data.ndim != 1:
+            raise ValueError(f"Se esperaba un vector 1D, se recibió la forma {data.shape}")
+        self.data = data
+        self.name = name
+
+    @property
+    def dim(self):
+        return self.data.shape[0]
+
+    def _component(self, index, axis):
+        if self.data.shape[0] <= index:
+            raise AttributeError(f"Un vector de dimensión {self.dim} no tiene componente {axis}")
+        return float(self.data[index])
+
+    @property
+    def x(self):
+        return self._component(0, 'x')
+
+    @property
+    def y(self):
+        return self._component(1, 'y')
+
+    @property
+    def z(self):
+        return self._component(2, 'z')
+
+    def _components(self):
+        return tuple(self.data.tolist())
+
+    # Protocolo de secuencia / arreglo (API basada en tuplas)
+
+    def __len__(self):
+        return self.data.shape[0]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.data[index]
+        return float(self.data[index])
+
+    def __iter__(self):
+        return iter(self.data.tolist())
+
+    def __array__(self, dtype=None, copy=None):
+        """Protocolo de NumPy 2: ``copy=False`` falla si hay que convertir el tipo"""
+        if dtype is None or self.data.dtype == np.dtype(dtype):
+            return self.data.copy() if copy else self.data
+        if copy is False:
+            raise ValueError(f"No se puede convertir el vector a {np.dtype(dtype)} sin copiarlo")
+        return self.data.astype(dtype)
+
+    def __repr__(self):
+        return f"VectorND({self.data.tolist()!r}, name={str(self.name)!r})"
+
+    # Álgebra vectorial
+
+    def __add__(self, other):
+        """Suma de vectores"""
+        return VectorND(self.data + _as_data(other),
+                        name_add(self.name, getattr(other, 'name', 'v')))
+
+    def __radd__(self, other):
+        """Permite sum(vectores), que empieza sumando 0"""
+        if isinstance(other, (int, float)) and other == 0:
+            return self
+        return NotImplemented
+
+    def __sub__(self, other):
+        """Resta de vectores"""
+        return VectorND(self.data - _as_data(other),
+                        name_sub(self.name, getattr(other, 'name', 'v')))
+
+    def __mul__(self, scalar):
+        """Multiplicación por escalar"""
+        return VectorND(self.data * scalar, name_scale(scalar, self.name))
+
+    __rmul__ = __mul__
+
+    def dot(self, other):
+        """Producto punto"""
+        return float(np.dot(self.data, _as_data(other)))
+
+    def cross(self, other):
+        """Producto cruz (solo en R^3)"""
+        if self.dim != 3:
+            raise ValueError("El producto cruz solo está definido en R^3")
+        return VectorND(np.cross(self.data, _as_data(other)),
+                        name_cross(self.name, getattr(other, 'name', 'v')))
+
+    def magnitude(self):
+        """Magnitud (norma euclídea) del vector"""
+        return math.sqrt(float(np.dot(self.data, self.data)))
+
+    def angle(self):
+        """Ángulo con respecto al eje x (en grados), en el plano xy"""
+        return math.degrees(math.atan2(self.y, self.x))
+
+    def angle_between(self, other):
+        """
+        Ángulo con otro vector (en grados)
+
+        El ángulo no está definido si alguno de los vectores es nulo.
+
+        >>> VectorND([1, 0, 0]).angle_between([0, 2, 0])
+        90.0
+        >>> VectorND([1, 0, 0]).angle_between([0, 0, 0])
+        Traceback (most recent call last):
+        ...
+        ValueError: El ángulo no está definido para el vector nulo
+        """
+        other = _as_data(other)
+        denom = self.magnitude() * float(np.linalg.norm(other))
+        if denom == 0:
+            raise ValueError("El ángulo no está definido para el vector nulo")
+        cos_angle = np.dot(self.data, other) / denom
+        return math.degrees(math.acos(min(1.0, max(-1.0, cos_angle))))
+
+    def normalize(self):
+        """Vector unitario"""
+        mag = self.magnitude()
+        if mag > 0:
+            return VectorND(self.data / mag, name_hat(self.name))
+        return self
+
+    def to_latex(self):
+        """Representación LaTeX del vector"""
+        rows = " \\\\ ".join(format_numbers(self.data))
+        return f"\\begin{{pmatrix}} {rows} \\end{{pmatrix}}"
+
+    def to_tuple(self):
+        return self._components()
@@ -6,81 +6,142 @@ Autor: Deyvi Samuel Barrera
 Versión: 1.0
 """
 
+import math
 import numpy as np
 from pylatex import Document, Section, Subsection, TikZ, Math, Package
 from pylatex.utils import NoEscape
 import os
 
-class Vector2D:
+from latex_build import build_document
+from latex_stream import StreamingDocument
+from scene_bounds import SceneBounds, max_abs
+from tikz_emitter import format_numbers, format_points
+from vector_io import dimension, iter_chunks
+from view3d import View3D
+from vector_names import name_add, name_sub, name_scale, name_cross, name_hat
+
+class _FrozenVector:
+    """Base de los vectores inmutables: sin __dict__ y con magnitudes en caché"""
+    
+    __slots__ = ()
+    
+    def __setattr__(self, attr, value):
+        raise AttributeError(f"{type(self).__name__} es inmutable")
+    
+    def __delattr__(self, attr):
+        raise AttributeError(f"{type(self).__name__} es inmutable")
+    
+    def __reduce__(self):
+        return (type(self), self._components() + (self.name,))
+
+
+class Vector2D(_FrozenVector):
     """Clase para representar y operar con vectores en 2D"""
     
+    dim = 2
+    __slots__ = ('x', 'y', 'name', '_magnitude', '_angle')
+    
     def __init__(self, x, y, name="v"):
-        self.x = float(x)
-        self.y = float(y)
-        self.name = name
+        _set = object.__setattr__
+        _set(self, 'x', float(x))
+        _set(self, 'y', float(y))
+        _set(self, 'name', name)
+    
+    def _components(self):
+        return (self.x, self.y)
     
     def __add__(self, other):
         """Suma de vectores"""
         return Vector2D(self.x + other.x, self.y + other.y, 
-                       f"{self.name}+{other.name}")
+                       name_add(self.name, other.name))
+    
+    def __radd__(self, other):
+        """Permite sum(vectores), que empieza sumando 0"""
+        if other == 0:
+            return self
+        return NotImplemented
     
     def __sub__(self, other):
         """Resta de vectores"""
         return Vector2D(self.x - other.x, self.y - other.y,
-                       f"{self.name}-{other.name}")
+                       name_sub(self.name, other.name))
     
     def __mul__(self, scalar):
         """Multiplicación por escalar"""
         return Vector2D(self.x * scalar, self.y * scalar,
-                       f"{scalar}{self.name}")
+                       name_scale(scalar, self.name))
     
     def dot(self, other):
         """Producto punto"""
         return self.x * other.x + self.y * other.y
     
     def magnitude(self):
-        """Magnitud del vector"""
-        return np.sqrt(self.x**2 + self.y**2)
+        """Magnitud del vector (se calcula una sola vez)"""
+        try:
+            return self._magnitude
+        except AttributeError:
+            mag = math.sqrt(self.x * self.x + self.y * self.y)
+            object.__setattr__(self, '_magnitude', mag)
+            return mag
     
     def angle(self):
-        """Ángulo con respecto al eje x (en grados)"""
-        return np.degrees(np.arctan2(self.y, self.x))
+        """Ángulo con respecto al eje x (en grados, se calcula una sola vez)"""
+        try:
+            return self._angle
+        except AttributeError:
+            ang = math.degrees(math.atan2(self.y, self.x))
+            object.__setattr__(self, '_angle', ang)
+            return ang
     
     def normalize(self):
         """Vector unitario"""
         mag = self.magnitude()
         if mag > 0:
-            return Vector2D(self.x/mag, self.y/mag, f"\\hat{{{self.name}}}")
+            return Vector2D(self.x/mag, self.y/mag, name_hat(self.name))
         return self
     
     def to_latex(self):
         """Representación LaTeX del vector"""
-        return f"\\begin{{pmatrix}} {self.x:.2f} \\\\ {self.y:.2f} \\end{{pmatrix}}"
+        rows = " \\\\ ".join(format_numbers(self._components()))
+        return f"\\begin{{pmatrix}} {rows} \\end{{pmatrix}}"
 
 
-class Vector3D:
+class Vector3D(_FrozenVector):
     """Clase para representar y operar con vectores en 3D"""
     
+    dim = 3
+    __slots__ = ('x', 'y', 'z', 'name', '_magnitude')
+    
     def __init__(self, x, y, z, name="w"):
-        self.x = float(x)
-        self.y = float(y)
-        self.z = float(z)
-        self.name = name
+        _set = object.__setattr__
+        _set(self, 'x', float(x))
+        _set(self, 'y', float(y))
+        _set(self, 'z', float(z))
+        _set(self, 'name', name)
+    
+    def _components(self):
+        return (self.x, self.y, self.z)
     
     def __add__(self, other):
         """Suma de vectores"""
         return Vector3D(self.x + other.x, self.y + other.y, 
-                       self.z + other.z, f"{self.name}+{other.name}")
+                       self.z + other.z, name_add(self.name, other.name))
+    
+    def __radd__(self, other):
+        """Permite sum(vectores), que empieza sumando 0"""
+        if other == 0:
+            return self
+        return NotImplemented
     
     def __sub__(self, other):
         """Resta de vectores"""
         return Vector3D(self.x - other.x, self.y - other.y,
-                       self.z - other.z, f"{self.name}-{other.name}")
+                       self.z - other.z, name_sub(self.name, other.name))
     
     def __mul__(self, scalar):
         """Multiplicación por escalar"""
         return Vector3D(self.x * scalar, self.y * scalar, 
-                       self.z * scalar, f"{scalar}{self.name}")
+                       self.z * scalar, name_scale(scalar, self.name))
     
     def dot(self, other):
         """Producto punto"""
@@ -91,31 +152,218 @@ class Vector3D:
         cx = self.y * other.z - self.z * other.y
         cy = self.z * other.x - self.x * other.z
         cz = self.x * other.y - self.y * other.x
-        return Vector3D(cx, cy, cz, f"{self.name}\\times{other.name}")
+        return Vector3D(cx, cy, cz, name_cross(self.name, other.name))
     
     def magnitude(self):
-        """Magnitud del vector"""
-        return np.sqrt(self.x**2 + self.y**2 + self.z**2)
+        """Magnitud del vector (se calcula una sola vez)"""
+        try:
+            return self._magnitude
+        except AttributeError:
+            mag = math.sqrt(self.x * self.x + self.y * self.y + self.z * self.z)
+            object.__setattr__(self, '_magnitude', mag)
+            return mag
     
     def normalize(self):
         """Vector unitario"""
         mag = self.magnitude()
         if mag > 0:
             return Vector3D(self.x/mag, self.y/mag, self.z/mag,
-                           f"\\hat{{{self.name}}}")
+                           name_hat(self.name))
         return self
     
     def to_latex(self):
         """Representación LaTeX del vector"""
-        return f"\\begin{{pmatrix}} {self.x:.2f} \\\\ {self.y:.2f} \\\\ {self.z:.2f} \\end{{pmatrix}}"
+        rows = " \\\\ ".join(format_numbers(self._components()))
+        return f"\\begin{{pmatrix}} {rows} \\end{{pmatrix}}"
+
+
+class _VectorBatch:
+    """Base común de los lotes de vectores respaldados por un arreglo (N, dim)"""
+    
+    dim = None
+    vector_class = None
+    
+    def __init__(self, data, name="v", names=None):
+        self.data = np.ascontiguousarray(data, dtype=float).reshape(-1, self.dim)
+        self.name = name
+        self.names = names
+    
+    @classmethod
+    def from_vectors(cls, vectors, name="v"):
+        """Construye el lote a partir de objetos Vector2D/Vector3D o tuplas"""
+        rows = [_components(v, cls.dim) for v in vectors]
+        names = [v.name for v in vectors if hasattr(v, 'name')]
+        return cls(rows, name, names if len(names) == len(rows) else None)
+    
+    @classmethod
+    def iter_chunks(cls, source, chunk_size=None, name=None):
+        """
+        Recorre un arreglo, memmap o CSVVectors (ver vector_io) como lotes
+        
+        Cada lote tiene a lo sumo chunk_size vectores; solo uno está en
+        memoria a la vez.
+        """
+        if dimension(source) != cls.dim:
+            raise ValueError(f"{cls.__name__} necesita vectores de dimensión {cls.dim}, "
+                             f"la fuente tiene {dimension(source)}")
+        for block in iter_chunks(source, chunk_size):
+            yield cls(block) if name is None else cls(block, name)
+    
+    def _new(self, data, name):
+        return type(self)(data, name)
+    
+    def __len__(self):
+        return self.data.shape[0]
+    
+    def __getitem__(self, index):
+        """
+        Un índice entero devuelve un vector individual; un slice, otro lote
+        
+        Los índices negativos cuentan desde el final, también en el nombre:
+        
+        >>> lote = VectorBatch2D(np.ones((3, 2)), 'F')
+        >>> lote[-1].name, lote[1:].labels()
+        ('F_{3}', ['F_{2}', 'F_{3}'])
+        """
+        if isinstance(index, (int, np.integer)):
+            index = range(len(self))[index]
+            return self.vector_class(*self.data[index], self.label(index))
+        # Los nombres se toman de label() para conservar la numeración original
+        names = [self.label(i) for i in np.arange(len(self))[index]]
+        return type(self)(self.data[index], self.name, names)
+    
+    @property
+    def x(self):
+        return self.data[:, 0]
+    
+    @property
+    def y(self):
+        return self.data[:, 1]
+    
+    def label(self, i):
+        """Nombre LaTeX del i-ésimo vector"""
+        if self.names is not None:
+            return self.names[i]
+        return f"{self.name}_{{{i+1}}}"
+    
+    def labels(self):
+        """Nombres LaTeX de todos los vectores del lote"""
+        if self.names is not None:
+            return list(self.names)
+        return [f"{self.name}_{{{i+1}}}" for i in range(len(self))]
+    
+    def __add__(self, other):
+        """Suma elemento a elemento (o con un único vector por broadcasting)"""
+        return self._new(self.data + _as_rows(other, self.dim), name_add(self.name, _name_of(other)))
+    
+    def __sub__(self, other):
+        """Resta elemento a elemento"""
+        return self._new(self.data - _as_rows(other, self.dim), name_sub(self.name, _name_of(other)))
+    
+    def __mul__(self, scalar):
+        """Multiplicación por escalar o por un arreglo (N,) de escalares"""
+        factor = np.asarray(scalar, dtype=float)
+        if factor.ndim == 1:
+            factor = factor[:, None]
+        return self._new(self.data * factor, name_scale(scalar, self.name) if np.ndim(scalar) == 0 else self.name)
+    
+    __rmul__ = __mul__
+    
+    def dot(self, other):
+        """Productos punto, arreglo (N,)"""
+        return np.einsum('ij,ij->i', self.data, np.broadcast_to(_as_rows(other, self.dim), self.data.shape))
+    
+    def magnitude(self):
+        """Magnitudes, arreglo (N,)"""
+        return np.sqrt(np.einsum('ij,ij->i', self.data, self.data))
+    
+    norm = magnitude
+    
+    def normalize(self):
+        """Vectores unitarios; los vectores nulos se conservan"""
+        mag = self.magnitude()
+        safe = np.where(mag > 0, mag, 1.0)
+        return self._new(self.data / safe[:, None], name_hat(self.name))
+    
+    def angle_between(self, other):
+        """Ángulo con otro vector o lote (en grados), arreglo (N,)"""
+        denom = self.magnitude() * np.sqrt(np.sum(np.square(_as_rows(other, self.dim)), axis=-1))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cos_angle = self.dot(other) / denom
+        return np.degrees(np.arccos(np.clip(cos_angle, -1, 1)))
+    
+    def angle(self):
+        """Ángulos con respecto al eje x (en grados), arreglo (N,)"""
+        return np.degrees(np.arctan2(self.data[:, 1], self.data[:, 0]))
+    
+    def to_vectors(self):
+        """Convierte el lote en objetos individuales"""
+        return [self[i] for i in range(len(self))]
+
+
+class VectorBatch2D(_VectorBatch):
+    """Lote de vectores 2D respaldado por un arreglo contiguo (N, 2)"""
+    
+    dim = 2
+    vector_class = Vector2D
+
+
+class VectorBatch3D(_VectorBatch):
+    """Lote de vectores 3D respaldado por un arreglo contiguo (N, 3)"""
+    
+    dim = 3
+    vector_class = Vector3D
+    
+    def __init__(self, data, name="w", names=None):
+        super().__init__(data, name, names)
+    
+    @property
+    def z(self):
+        return self.data[:, 2]
+    
+    def cross(self, other):
+        """Productos cruz elemento a elemento"""
+        return self._new(np.cross(self.data, _as_rows(other, self.dim)),
+                         name_cross(self.name, _name_of(other)))
+
+
+def _components(v, dim):
+    """Componentes de un Vector2D/Vector3D o de una secuencia"""
+    if hasattr(v, 'x'):
+        return (v.x, v.y, v.z) if dim == 3 else (v.x, v.y)
+    return tuple(v)[:dim]
+
+
+def _as_rows(other, dim):
+    """Arreglo (N, dim) o (dim,) listo para operar por broadcasting"""
+    if isinstance(other, _VectorBatch):
+        return other.data
+    return np.asarray(_components(other, dim), dtype=float)
+
+
+def _name_of(other):
+    return getattr(other, 'name', 'v')
 
 
 class VectorDocument:
     """Clase para generar documentos LaTeX con visualizaciones de vectores"""
     
-    def __init__(self, title="Visualizacion de Vectores"):
+    def __init__(self, title="Visualizacion de Vectores", stream=False, project_3d=False):
+        """
+        Args:
+            title: Título del documento
+            stream: Si es True, el .tex se escribe en disco a medida que se
+                añade contenido en vez de acumularse en memoria
+            project_3d: Si es True, las figuras 3D se proyectan en Python y
+                se escriben en 2D (TeX no calcula la proyección al compilar)
+        """
         # Configuración del documento
-        self.doc = Document(documentclass='article')
+        self.stream = stream
+        self.project_3d = project_3d
+        if stream:
+            self.doc = StreamingDocument(documentclass='article')
+        else:
+            self.doc = Document(documentclass='article')
         
         # Paquetes necesarios
         self.doc.packages.append(Package('babel', options=['spanish']))
@@ -123,7 +371,7 @@ class VectorDocument:
         self.doc.packages.append(Package('amsmath'))
         self.doc.packages.append(Package('amssymb'))
         self.doc.packages.append(Package('tikz'))
-        self.doc.packages.append(Package('tikz-3dplot'))
+        self.doc.packages.append(Package(NoEscape('tikz-3dplot')))
         self.doc.packages.append(Package('xcolor'))
         self.doc.packages.append(Package('geometry', options=['margin=2cm']))
         
@@ -143,8 +391,21 @@ class VectorDocument:
         
         self.doc.append(NoEscape(r'\maketitle'))
     
+    def add_vector(self, vector, color='vec1', title=None):
+        """Añade un vector (o lote) eligiendo el dibujo 2D o 3D según su dimensión"""
+        
+        dim = getattr(vector, 'dim', None)
+        if dim == 2:
+            return self.add_vector_2d(vector, color, title)
+        if dim == 3:
+            return self.add_vector_3d(vector, color, title)
+        raise ValueError(f"Solo se pueden visualizar vectores 2D o 3D (dimensión {dim})")
+    
     def add_vector_2d(self, vector, color='vec1', title=None):
-        """Añade visualización de un vector 2D"""
+        """Añade visualización de un vector 2D (o de un VectorBatch2D completo)"""
+        
+        if isinstance(vector, VectorBatch2D):
+            return self._add_vector_batch(vector, color, title)
         
         if title:
             self.doc.append(Subsection(title))
@@ -160,33 +421,37 @@ class VectorDocument:
         self.doc.append(NoEscape(f'\\\\[0.5cm]'))
         
         # Visualización TikZ
-        scale = min(3.0, 4.0 / max(abs(vector.x), abs(vector.y), 1))
-        max_coord = max(abs(vector.x), abs(vector.y)) * 1.2
+        bounds = SceneBounds.from_vectors([vector._components()], 2, margin=1.2)
+        scale = bounds.fit_scale(min(3.0, 4.0 / max(abs(vector.x), abs(vector.y), 1)))
+        max_coord = bounds.limit
+        vx, vy = bounds.coordinates(vector._components())
+        x, y, half_x, half_y, lo, hi, scale, step = format_numbers(
+            [vx, vy, vx/2, vy/2, -max_coord*0.2, max_coord, scale, bounds.step])
         
         tikz_code = f"""
         \\begin{{center}}
         \\begin{{tikzpicture}}[scale={scale}]
             % Ejes
-            \\draw[->,thick,gray] ({-max_coord*0.2},0) -- ({max_coord},0) node[right] {{$x$}};
-            \\draw[->,thick,gray] (0,{-max_coord*0.2}) -- (0,{max_coord}) node[above] {{$y$}};
+            \\draw[->,thick,gray] ({lo},0) -- ({hi},0) node[right] {{$x$}};
+            \\draw[->,thick,gray] (0,{lo}) -- (0,{hi}) node[above] {{$y$}};
             
             % Cuadrícula
-            \\draw[step=1,gray,very thin,opacity=0.3] ({-max_coord*0.2},{-max_coord*0.2}) grid ({max_coord},{max_coord});
+            \\draw[step={step},gray,very thin,opacity=0.3] ({lo},{lo}) grid ({hi},{hi});
             
             % Vector
-            \\draw[->,ultra thick,{color},line width=1.5pt] (0,0) -- ({vector.x},{vector.y}) 
+            \\draw[->,ultra thick,{color},line width=1.5pt] (0,0) -- ({x},{y}) 
                 node[midway,above left] {{$\\vec{{{vector.name}}}$}};
             
             % Componentes (líneas punteadas)
-            \\draw[dashed,{color},opacity=0.5] ({vector.x},0) -- ({vector.x},{vector.y});
-            \\draw[dashed,{color},opacity=0.5] (0,{vector.y}) -- ({vector.x},{vector.y});
+            \\draw[dashed,{color},opacity=0.5] ({x},0) -- ({x},{y});
+            \\draw[dashed,{color},opacity=0.5] (0,{y}) -- ({x},{y});
             
             % Etiquetas de componentes
-            \\node[below,{color}] at ({vector.x/2},0) {{${vector.name}_x={vector.x:.2f}$}};
-            \\node[left,{color}] at (0,{vector.y/2}) {{${vector.name}_y={vector.y:.2f}$}};
+            \\node[below,{color}] at ({half_x},0) {{${vector.name}_x={vector.x:.2f}$}};
+            \\node[left,{color}] at (0,{half_y}) {{${vector.name}_y={vector.y:.2f}$}};
             
             % Punto final
-            \\fill[{color}] ({vector.x},{vector.y}) circle (2pt);
+            \\fill[{color}] ({x},{y}) circle (2pt);
         \\end{{tikzpicture}}
         \\end{{center}}
         """
@@ -207,42 +472,46 @@ class VectorDocument:
         self.doc.append(NoEscape(formula))
         
         # Visualización
-        scale = min(2.5, 5.0 / max(abs(result.x), abs(result.y), 1))
-        max_coord = max(abs(v1.x), abs(v1.y), abs(v2.x), abs(v2.y), 
-                       abs(result.x), abs(result.y)) * 1.3
+        bounds = SceneBounds.from_vectors(
+            [v1._components(), v2._components(), result._components()], 2, margin=1.3)
+        scale = bounds.fit_scale(min(2.5, 5.0 / max(abs(result.x), abs(result.y), 1)))
+        max_coord = bounds.limit
+        lo, hi, scale, step = format_numbers([-max_coord*0.2, max_coord, scale, bounds.step])
+        p1, p2, pr = format_points(bounds.coordinates(
+            [v1._components(), v2._components(), result._components()]))
         
         tikz_code = f"""
         \\begin{{center}}
         \\begin{{tikzpicture}}[scale={scale}]
             % Ejes
-            \\draw[->,thick,gray] ({-max_coord*0.2},0) -- ({max_coord},0) node[right] {{$x$}};
-            \\draw[->,thick,gray] (0,{-max_coord*0.2}) -- (0,{max_coord}) node[above] {{$y$}};
+            \\draw[->,thick,gray] ({lo},0) -- ({hi},0) node[right] {{$x$}};
+            \\draw[->,thick,gray] (0,{lo}) -- (0,{hi}) node[above] {{$y$}};
             
             % Cuadrícula
-            \\draw[step=1,gray,very thin,opacity=0.2] ({-max_coord*0.2},{-max_coord*0.2}) grid ({max_coord},{max_coord});
+            \\draw[step={step},gray,very thin,opacity=0.2] ({lo},{lo}) grid ({hi},{hi});
             
             % Vector v1
-            \\draw[->,ultra thick,vec1,line width=1.2pt] (0,0) -- ({v1.x},{v1.y}) 
+            \\draw[->,ultra thick,vec1,line width=1.2pt] (0,0) -- {p1} 
                 node[midway,below left] {{$\\vec{{{v1.name}}}$}};
             
             % Vector v2 desde el origen
-            \\draw[->,ultra thick,vec2,line width=1.2pt] (0,0) -- ({v2.x},{v2.y}) 
+            \\draw[->,ultra thick,vec2,line width=1.2pt] (0,0) -- {p2} 
                 node[midway,above right] {{$\\vec{{{v2.name}}}$}};
             
             % Vector v2 desde v1 (método del paralelogramo)
-            \\draw[->,thick,vec2,dashed,opacity=0.7] ({v1.x},{v1.y}) -- ({result.x},{result.y});
+            \\draw[->,thick,vec2,dashed,opacity=0.7] {p1} -- {pr};
             
             % Vector v1 desde v2 (método del paralelogramo)
-            \\draw[->,thick,vec1,dashed,opacity=0.7] ({v2.x},{v2.y}) -- ({result.x},{result.y});
+            \\draw[->,thick,vec1,dashed,opacity=0.7] {p2} -- {pr};
             
             % Vector resultado
-            \\draw[->,ultra thick,vec3,line width=2pt] (0,0) -- ({result.x},{result.y}) 
+            \\draw[->,ultra thick,vec3,line width=2pt] (0,0) -- {pr} 
                 node[midway,above,yshift=5pt] {{$\\vec{{{v1.name}}}+\\vec{{{v2.name}}}$}};
             
             % Puntos
-            \\fill[vec1] ({v1.x},{v1.y}) circle (2pt);
-            \\fill[vec2] ({v2.x},{v2.y}) circle (2pt);
-            \\fill[vec3] ({result.x},{result.y}) circle (3pt);
+            \\fill[vec1] {p1} circle (2pt);
+            \\fill[vec2] {p2} circle (2pt);
+            \\fill[vec3] {pr} circle (3pt);
         \\end{{tikzpicture}}
         \\end{{center}}
         """
@@ -250,7 +519,10 @@ class VectorDocument:
         self.doc.append(NoEscape(tikz_code))
     
     def add_vector_3d(self, vector, color='vec1', title=None):
-        """Añade visualización de un vector 3D"""
+        """Añade visualización de un vector 3D (o de un VectorBatch3D completo)"""
+        
+        if isinstance(vector, VectorBatch3D):
+            return self._add_vector_batch(vector, color, title)
         
         if title:
             self.doc.append(Subsection(title))
@@ -264,36 +536,45 @@ class VectorDocument:
         self.doc.append(NoEscape(f'\\\\[0.5cm]'))
         
         # Visualización TikZ-3dplot
-        scale = min(1.5, 4.0 / max(abs(vector.x), abs(vector.y), abs(vector.z), 1))
+        # Los ejes miden 5 aunque el vector sea más corto
+        extent = max(abs(vector.x), abs(vector.y), abs(vector.z), 1)
+        bounds = SceneBounds(max(extent, 5))
+        scale = format_numbers([bounds.fit_scale(min(1.5, 4.0 / extent))])[0]
+        x, y, z = vector.x, vector.y, vector.z
+        view = View3D((65, 115), self.project_3d)
+        header = '\n        '.join(view.header(f'scale={scale}'))
+        o = view.origin
+        ex, ey, ez, exy, p, pxy, px, py, pz = view.points(bounds.coordinates(
+            [(5, 0, 0), (0, 5, 0), (0, 0, 5), (5, 5, 0),
+             (x, y, z), (x, y, 0), (x, 0, 0), (0, y, 0), (0, 0, z)]))
         
         tikz_code = f"""
         \\begin{{center}}
-        \\tdplotsetmaincoords{{65}}{{115}}
-        \\begin{{tikzpicture}}[tdplot_main_coords,scale={scale}]
+        {header}
             % Ejes
-            \\draw[->,thick,gray] (0,0,0) -- (5,0,0) node[right] {{$x$}};
-            \\draw[->,thick,gray] (0,0,0) -- (0,5,0) node[above] {{$y$}};
-            \\draw[->,thick,gray] (0,0,0) -- (0,0,5) node[above] {{$z$}};
+            \\draw[->,thick,gray] {o} -- {ex} node[right] {{$x$}};
+            \\draw[->,thick,gray] {o} -- {ey} node[above] {{$y$}};
+            \\draw[->,thick,gray] {o} -- {ez} node[above] {{$z$}};
             
             % Plano xy
-            \\draw[gray,very thin,opacity=0.2] (0,0,0) -- (5,0,0) -- (5,5,0) -- (0,5,0) -- cycle;
+            \\draw[gray,very thin,opacity=0.2] {o} -- {ex} -- {exy} -- {ey} -- cycle;
             
             % Vector 3D
-            \\draw[->,ultra thick,{color},line width=1.5pt] (0,0,0) -- ({vector.x},{vector.y},{vector.z}) 
+            \\draw[->,ultra thick,{color},line width=1.5pt] {o} -- {p} 
                 node[above right] {{$\\vec{{{vector.name}}}$}};
             
             % Proyecciones
-            \\draw[dashed,{color},opacity=0.5] ({vector.x},{vector.y},0) -- ({vector.x},{vector.y},{vector.z});
-            \\draw[dashed,gray,opacity=0.3] ({vector.x},0,0) -- ({vector.x},{vector.y},0);
-            \\draw[dashed,gray,opacity=0.3] (0,{vector.y},0) -- ({vector.x},{vector.y},0);
+            \\draw[dashed,{color},opacity=0.5] {pxy} -- {p};
+            \\draw[dashed,gray,opacity=0.3] {px} -- {pxy};
+            \\draw[dashed,gray,opacity=0.3] {py} -- {pxy};
             
             % Componentes en el plano
-            \\draw[->,{color},opacity=0.6] (0,0,0) -- ({vector.x},0,0) node[midway,below] {{${vector.name}_x$}};
-            \\draw[->,{color},opacity=0.6] (0,0,0) -- (0,{vector.y},0) node[midway,left] {{${vector.name}_y$}};
-            \\draw[->,{color},opacity=0.6] (0,0,0) -- (0,0,{vector.z}) node[midway,left] {{${vector.name}_z$}};
+            \\draw[->,{color},opacity=0.6] {o} -- {px} node[midway,below] {{${vector.name}_x$}};
+            \\draw[->,{color},opacity=0.6] {o} -- {py} node[midway,left] {{${vector.name}_y$}};
+            \\draw[->,{color},opacity=0.6] {o} -- {pz} node[midway,left] {{${vector.name}_z$}};
             
             % Punto final
-            \\fill[{color}] ({vector.x},{vector.y},{vector.z}) circle (2pt);
+            \\fill[{color}] {p} circle (2pt);
         \\end{{tikzpicture}}
         \\end{{center}}
         """
@@ -316,43 +597,104 @@ class VectorDocument:
         self.doc.append(NoEscape(formula))
         
         # Visualización
+        points = [(4, 0, 0), (0, 4, 0), (0, 0, 4), v1._components(), v2._components(),
+                  (v1 + v2)._components(), result._components()]
+        bounds = SceneBounds.from_vectors(points, 3)
+        scale = format_numbers([bounds.fit_scale(1.2)])[0]
+        view = View3D((70, 120), self.project_3d)
+        header = '\n        '.join(view.header(f'scale={scale}'))
+        o = view.origin
+        ex, ey, ez, p1, p2, p12, pr = view.points(bounds.coordinates(points))
         tikz_code = f"""
         \\begin{{center}}
-        \\tdplotsetmaincoords{{70}}{{120}}
-        \\begin{{tikzpicture}}[tdplot_main_coords,scale=1.2]
+        {header}
             % Ejes
-            \\draw[->,thick,gray] (0,0,0) -- (4,0,0) node[right] {{$x$}};
-            \\draw[->,thick,gray] (0,0,0) -- (0,4,0) node[above] {{$y$}};
-            \\draw[->,thick,gray] (0,0,0) -- (0,0,4) node[above] {{$z$}};
+            \\draw[->,thick,gray] {o} -- {ex} node[right] {{$x$}};
+            \\draw[->,thick,gray] {o} -- {ey} node[above] {{$y$}};
+            \\draw[->,thick,gray] {o} -- {ez} node[above] {{$z$}};
             
             % Vector v1
-            \\draw[->,ultra thick,vec1,line width=1.2pt] (0,0,0) -- ({v1.x},{v1.y},{v1.z}) 
+            \\draw[->,ultra thick,vec1,line width=1.2pt] {o} -- {p1} 
                 node[below right] {{$\\vec{{{v1.name}}}$}};
             
             % Vector v2
-            \\draw[->,ultra thick,vec2,line width=1.2pt] (0,0,0) -- ({v2.x},{v2.y},{v2.z}) 
+            \\draw[->,ultra thick,vec2,line width=1.2pt] {o} -- {p2} 
                 node[above left] {{$\\vec{{{v2.name}}}$}};
             
             % Plano formado por v1 y v2 (semi-transparente)
-            \\fill[gray,opacity=0.15] (0,0,0) -- ({v1.x},{v1.y},{v1.z}) -- 
-                ({v1.x+v2.x},{v1.y+v2.y},{v1.z+v2.z}) -- ({v2.x},{v2.y},{v2.z}) -- cycle;
+            \\fill[gray,opacity=0.15] {o} -- {p1} -- 
+                {p12} -- {p2} -- cycle;
             
             % Vector producto cruz (perpendicular)
-            \\draw[->,ultra thick,vec3,line width=1.8pt] (0,0,0) -- ({result.x},{result.y},{result.z}) 
+            \\draw[->,ultra thick,vec3,line width=1.8pt] {o} -- {pr} 
                 node[above,xshift=5pt] {{$\\vec{{{v1.name}}}\\times\\vec{{{v2.name}}}$}};
             
             % Puntos
-            \\fill[vec1] ({v1.x},{v1.y},{v1.z}) circle (2pt);
-            \\fill[vec2] ({v2.x},{v2.y},{v2.z}) circle (2pt);
-            \\fill[vec3] ({result.x},{result.y},{result.z}) circle (3pt);
+            \\fill[vec1] {p1} circle (2pt);
+            \\fill[vec2] {p2} circle (2pt);
+            \\fill[vec3] {pr} circle (3pt);
         \\end{{tikzpicture}}
         \\end{{center}}
         """
         
         self.doc.append(NoEscape(tikz_code))
     
-    def generate_pdf(self, filename='vector_output'):
-        """Genera el archivo PDF"""
+    def _add_vector_batch(self, batch, color, title, max_labels=10):
+        """Visualiza un lote completo en una sola figura sin crear objetos por vector"""
+        
+        if title:
+            self.doc.append(Subsection(title))
+        
+        # Resumen vectorizado del lote
+        mags = batch.magnitude()
+        if len(batch):
+            self.doc.append(NoEscape(
+                f'Vectores: ${len(batch)}$\\\\[0.3cm]\n'
+                f'Magnitud: minima ${mags.min():.3f}$, media ${mags.mean():.3f}$, '
+                f'maxima ${mags.max():.3f}$\\\\[0.5cm]'))
+        else:
+            self.doc.append(NoEscape('Vectores: $0$\\\\[0.5cm]'))
+        
+        extent = max(max_abs(batch.data, batch.dim), 1.0)
+        bounds = SceneBounds(extent * 1.2)
+        lo, hi, scale_2d, scale_3d = format_numbers(
+            [-bounds.limit*0.2, bounds.limit, bounds.fit_scale(min(3.0, 4.0 / extent)),
+             bounds.fit_scale(min(1.5, 4.0 / extent))])
+        show_labels = len(batch) <= max_labels
+        
+        lines = []
+        if batch.dim == 2:
+            origin = "(0,0)"
+            ends = format_points(bounds.coordinates(batch.data))
+            lines.append(f"\\begin{{tikzpicture}}[scale={scale_2d}]")
+            lines.append(f"    \\draw[->,thick,gray] ({lo},0) -- ({hi},0) node[right] {{$x$}};")
+            lines.append(f"    \\draw[->,thick,gray] (0,{lo}) -- (0,{hi}) node[above] {{$y$}};")
+        else:
+            view = View3D((65, 115), self.project_3d)
+            origin = view.origin
+            ends = view.points(bounds.coordinates(batch.data))
+            ex, ey, ez = view.points(np.eye(3) * bounds.limit)
+            lines.extend(view.header(f"scale={scale_3d}"))
+            lines.append(f"    \\draw[->,thick,gray] {origin} -- {ex} node[right] {{$x$}};")
+            lines.append(f"    \\draw[->,thick,gray] {origin} -- {ey} node[above] {{$y$}};")
+            lines.append(f"    \\draw[->,thick,gray] {origin} -- {ez} node[above] {{$z$}};")
+        
+        for i, end in enumerate(ends):
+            label = f" node[above right] {{$\\vec{{{batch.label(i)}}}$}}" if show_labels else ""
+            lines.append(f"    \\draw[->,thick,{color}] {origin} -- {end}{label};")
+        
+        lines.append("\\end{tikzpicture}")
+        tikz_code = "\n\\begin{center}\n" + "\n".join(lines) + "\n\\end{center}\n"
+        
+        self.doc.append(NoEscape(tikz_code))
+    
+    def generate_pdf(self, filename='vector_output', cache=None, externalize=False,
+                     parallel=False, formats=False):
+        """
+        Genera el archivo PDF
+        
+        Las opciones de compilación son las de ``latex_build.build_document``.
+        """
         
         # Crear directorio de salida si no existe
         os.makedirs('output', exist_ok=True)
@@ -360,8 +702,8 @@ class VectorDocument:
         filepath = os.path.join('output', filename)
         
         try:
-            self.doc.generate_pdf(filepath, clean_tex=False, compiler='pdflatex')
-            print(f"✓ PDF generado exitosamente: {filepath}.pdf")
+            build_document(self.doc, filepath, compiler='pdflatex', cache=cache,
+                           externalize=externalize, parallel=parallel, formats=formats)
             print(f"✓ Archivo .tex guardado en: {filepath}.tex")
             return True
         except Exception as e:
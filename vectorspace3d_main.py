@@ -7,21 +7,69 @@ import numpy as np
 from pylatex import Document, Section, Subsection, Math, TikZ, Axis, Plot
 from pylatex import Package, NoEscape, Figure, Command
 from pylatex.utils import bold
+import hashlib
 import os
+import shutil
+import tempfile
+import weakref
+
+from label_placement import LEADER_STYLE, draw_labels, label_layout
+from latex_build import build_document, write_tex
+from latex_stream import StreamingDocument
+from scene_bounds import SceneBounds, max_abs
+from tikz_emitter import (ColorRegistry, DEFAULT_PALETTE, StyleRegistry, TikZEmitter, colormap,
+                          format_number, format_numbers, format_points, format_rows, point)
+from vector_density import direction_histogram, endpoint_histogram, sample_rows
+from vector_io import as_array, as_rows, dimension, iter_chunks
+from view3d import View3D, painter_order, project
 
 class VectorSpace3D:
     """Clase principal para manejo de vectores y espacios vectoriales"""
     
-    def __init__(self, title="Análisis de Vectores y Espacios Vectoriales"):
-        self.doc = Document(documentclass='article')
+    # Con backend='auto', número de vectores a partir del cual se dibujan
+    # con un único quiver de pgfplots en vez de un \draw por vector
+    quiver_threshold = 2000
+    
+    # Con backend='auto', número de vectores a partir del cual ya no se
+    # dibujan flechas sino un mapa de densidad (backend 'heatmap')
+    density_threshold = 200_000
+    
+    # Carpeta, junto al .tex, donde se escriben las tablas de datos
+    data_dir = 'datos'
+    
+    # Las figuras 3D de TikZ se pintan de atrás hacia adelante
+    depth_sort = True
+    
+    # Con más vectores que esto, las figuras de TikZ escriben las
+    # coordenadas como una lista y los comandos una sola vez en un \foreach
+    compact_threshold = 50
+    
+    def __init__(self, title="Análisis de Vectores y Espacios Vectoriales", stream=False,
+                 project_3d=False):
+        """
+        Args:
+            title: Título del documento
+            stream: Si es True, el .tex se escribe en disco a medida que se
+                añaden secciones en vez de acumularse en memoria
+            project_3d: Si es True, las figuras 3D se proyectan en Python y
+                se escriben en 2D (TeX no calcula la proyección al compilar)
+        """
+        self.stream = stream
+        self.project_3d = project_3d
+        if stream:
+            self.doc = StreamingDocument(documentclass='article')
+        else:
+            self.doc = Document(documentclass='article')
         self.title = title
+        self._tables = {}
+        self._staging = None
         self._setup_document()
         
     def _setup_document(self):
         """Configura paquetes y preámbulo del documento"""
         # Paquetes esenciales
         self.doc.packages.append(Package('tikz'))
-        self.doc.packages.append(Package('tikz-3dplot'))
+        self.doc.packages.append(Package(NoEscape('tikz-3dplot')))
         self.doc.packages.append(Package('amsmath'))
         self.doc.packages.append(Package('amssymb'))
         self.doc.packages.append(Package('geometry', options='margin=2cm'))
@@ -43,28 +91,68 @@ class VectorSpace3D:
         self.doc.append(NoEscape(r'\tableofcontents'))
         self.doc.append(NoEscape(r'\newpage'))
     
+    def add_vectors(self, vectors, labels=None, title=None, colors=None, **kwargs):
+        """
+        Añade vectores eligiendo la visualización 2D o 3D según su dimensión
+        
+        Args:
+            vectors: Lista de VectorND/tuplas, arreglo (N, d) con d = 2 o 3,
+                memmap o CSVVectors (ver vector_io)
+            labels: Lista de etiquetas (por defecto, el nombre de cada VectorND)
+            title: Título de la sección
+            colors: Lista de colores para cada vector
+        """
+        dim = dimension(vectors)
+        if labels is None and isinstance(vectors, (list, tuple)) \
+                and all(hasattr(v, 'name') for v in vectors):
+            labels = [str(v.name) for v in vectors]
+        
+        if dim == 2:
+            return self.add_vector_2d(vectors, labels, title or "Vectores en 2D", colors, **kwargs)
+        if dim == 3:
+            return self.add_vector_3d(vectors, labels, title or "Vectores en 3D", colors, **kwargs)
+        raise ValueError(f"Solo se pueden visualizar vectores 2D o 3D (dimensión {dim})")
+    
     def add_vector_2d(self, vectors, labels=None, title="Vectores en 2D", 
-                      colors=None, show_grid=True):
+                      colors=None, show_grid=True, backend='auto', bins=None, sample=0):
         """
         Añade visualización de vectores en 2D
         
         Args:
-            vectors: Lista de tuplas (x, y)
+            vectors: Lista de tuplas (x, y), arreglo (N, 2), memmap o
+                CSVVectors (ver vector_io)
             labels: Lista de etiquetas para cada vector
             title: Título de la sección
             colors: Lista de colores para cada vector
+            backend: 'tikz' (un \\draw por vector), 'pgfplots' (un quiver
+                con los datos en un archivo externo), 'heatmap' (densidad de
+                los extremos), 'rose' (histograma de direcciones) o 'auto'
+            bins: Celdas por eje del heatmap o sectores de la rosa
+            sample: Flechas reales superpuestas a 'heatmap' / 'rose'
         """
+        backend = self._resolve_backend(backend, len(vectors))
         with self.doc.create(Section(title)):
             # Descripción matemática
             self.doc.append("Visualización de vectores en el espacio ")
             self.doc.append(Math(data=[r'\mathbb{R}^2']))
             self.doc.append(":\n\n")
             
+            if colors is None:
+                colors = list(DEFAULT_PALETTE)
+            
+            if backend in ('heatmap', 'rose'):
+                self._add_density(vectors, backend, colors[0], bins, sample)
+                return
+            
+            if backend == 'pgfplots':
+                self.doc.append(f"Campo de {len(vectors)} vectores.\n\n")
+                self.doc.append(NoEscape(self._generate_2d_quiver(vectors, colors[0], show_grid)))
+                return
+            
             # Listar vectores
+            vectors = as_array(vectors)
             if labels is None:
                 labels = [f'v_{i+1}' for i in range(len(vectors))]
-            if colors is None:
-                colors = ['blue', 'red', 'green', 'orange', 'purple']
             
             for i, (vec, label) in enumerate(zip(vectors, labels)):
                 self.doc.append(Math(data=[f'\\vect{{{label}}} = ({vec[0]}, {vec[1]})']))
@@ -77,50 +165,125 @@ class VectorSpace3D:
     def _generate_2d_plot(self, vectors, labels, colors, show_grid):
         """Genera código TikZ para gráfico 2D"""
         # Calcular límites del gráfico
-        max_val = max(max(abs(v[0]), abs(v[1])) for v in vectors) * 1.2
+        bounds = SceneBounds.from_vectors(vectors, 2, margin=1.2)
+        max_val = bounds.limit
+        scale = bounds.fit_scale(1.5)
         
-        code = r"\begin{center}" + "\n"
-        code += r"\begin{tikzpicture}[scale=1.5]" + "\n"
+        tikz = TikZEmitter()
+        tikz.begin('center')
+        tikz.begin('tikzpicture', f'scale={format_number(scale)}')
         
         # Ejes
-        code += f"    \\draw[->] ({-max_val},0) -- ({max_val},0) node[right] {{$x$}};\n"
-        code += f"    \\draw[->] (0,{-max_val}) -- (0,{max_val}) node[above] {{$y$}};\n"
+        tikz.draw('->', f"{point(-max_val, 0)} -- {point(max_val, 0)} node[right] {{$x$}}")
+        tikz.draw('->', f"{point(0, -max_val)} -- {point(0, max_val)} node[above] {{$y$}}")
         
         # Grid opcional
         if show_grid:
-            code += f"    \\draw[gray!30, very thin] ({-max_val},{-max_val}) grid ({max_val},{max_val});\n"
+            tikz.draw(bounds.grid_options('gray!30, very thin'),
+                      f"{point(-max_val, -max_val)} grid {point(max_val, max_val)}")
         
-        # Dibujar vectores
-        for i, (vec, label, color) in enumerate(zip(vectors, labels, colors)):
-            code += f"    \\draw[->, thick, {color}!80] (0,0) -- ({vec[0]},{vec[1]}) "
-            code += f"node[midway, above left] {{$\\vect{{{label}}}$}};\n"
-            code += f"    \\fill[{color}] ({vec[0]},{vec[1]}) circle (2pt);\n"
+        points = bounds.coordinates(vectors)[:, :2]
+        colors = colormap(len(points), colors)
+        if len(points) > self.compact_threshold:
+            self._foreach_2d(tikz, points, labels, colors, scale)
+            tikz.end('tikzpicture')
+            tikz.end('center')
+            return tikz.getvalue()
         
-        code += r"\end{tikzpicture}" + "\n"
-        code += r"\end{center}" + "\n"
+        # Dibujar vectores (coordenadas formateadas de una vez), con un
+        # estilo por color declarado una sola vez
+        ends = format_points(points)
+        styles = StyleRegistry.for_colors(colors)
+        layer = TikZEmitter()
+        drawn = list(zip(ends, labels, colors))
+        for end, label, color in drawn:
+            layer.draw(styles(f'->, thick, {color}!80'), f"(0,0) -- {end}")
+            layer.fill(styles(color), f"{end} circle (2pt)")
         
-        return code
+        # Etiquetas en el punto medio de cada vector, sin solaparse
+        draw_labels(layer, points[:len(drawn)] / 2,
+                    [f"$\\vect{{{label}}}$" for _, label, _ in drawn],
+                    [styles(f'{color}!80') for _, _, color in drawn], scale=scale)
+        styles.emit(tikz)
+        tikz.extend(layer)
+        
+        tikz.end('tikzpicture')
+        tikz.end('center')
+        
+        return tikz.getvalue()
+    
+    def _foreach_2d(self, tikz, points, labels, colors, scale):
+        """
+        Vectores 2D como lista x/y/color y un único \\foreach
+        
+        Las etiquetas se colocan sin solapamientos como en las figuras
+        pequeñas y se escriben en un segundo \\foreach con su posición ya
+        calculada (más uno para las líneas guía).
+        """
+        n = min(len(points), len(labels), len(colors))
+        points, labels = points[:n], labels[:n]
+        names = ColorRegistry.for_colors(colors[:n])
+        colors = [names(color) for color in colors[:n]]
+        names.emit(tikz)
+        rows = format_rows(points, sep='/')
+        tikz.foreach(['vx', 'vy', 'vc'], [f"{row}/{color}" for row, color in zip(rows, colors)], [
+            r'\draw[->, thick, \vc!80] (0,0) -- (\vx,\vy);',
+            r'\fill[\vc] (\vx,\vy) circle (2pt);',
+        ])
+        
+        # Etiquetas en el punto medio de cada vector, sin solaparse
+        anchors = points / 2
+        placed, centers, leader = label_layout(
+            anchors, [f"$\\vect{{{label}}}$" for label in labels], scale)
+        guides = format_rows(np.hstack([anchors[placed[leader]], centers[leader]]), sep='/')
+        tikz.foreach(['ax', 'ay', 'lx', 'ly'], guides, [
+            f'\\draw[{LEADER_STYLE}] (\\ax,\\ay) -- (\\lx,\\ly);',
+        ])
+        rows = format_rows(centers, sep='/')
+        tikz.foreach(['lx', 'ly', 'vc', 'vl'], [
+            f"{row}/{colors[i]}/{{{labels[i]}}}" for row, i in zip(rows, placed.tolist())
+        ], [r'\node[\vc!80] at (\lx,\ly) {$\vect{\vl}$};'])
     
     def add_vector_3d(self, vectors, labels=None, title="Vectores en 3D",
-                      colors=None, view_angle=(70, 120)):
+                      colors=None, view_angle=(70, 120), backend='auto', bins=None,
+                      sample=0):
         """
         Añade visualización de vectores en 3D usando tikz-3dplot
         
         Args:
-            vectors: Lista de tuplas (x, y, z)
+            vectors: Lista de tuplas (x, y, z), arreglo (N, 3), memmap o
+                CSVVectors (ver vector_io)
             labels: Lista de etiquetas
             colors: Lista de colores
             view_angle: (theta, phi) ángulos de visualización
+            backend: 'tikz' (un \\draw por vector), 'pgfplots' (un quiver
+                con los datos en un archivo externo), 'heatmap' / 'rose'
+                (densidad de la proyección en el plano xy) o 'auto'
+            bins: Celdas por eje del heatmap o sectores de la rosa
+            sample: Flechas reales superpuestas a 'heatmap' / 'rose'
         """
+        backend = self._resolve_backend(backend, len(vectors))
         with self.doc.create(Section(title)):
             self.doc.append("Visualización de vectores en el espacio ")
             self.doc.append(Math(data=[r'\mathbb{R}^3']))
             self.doc.append(":\n\n")
             
+            if colors is None:
+                colors = list(DEFAULT_PALETTE)
+            
+            if backend in ('heatmap', 'rose'):
+                self.doc.append("Proyección en el plano xy. ")
+                self._add_density(vectors, backend, colors[0], bins, sample)
+                return
+            
+            if backend == 'pgfplots':
+                self.doc.append(f"Campo de {len(vectors)} vectores.\n\n")
+                self.doc.append(NoEscape(self._generate_3d_quiver(vectors, colors[0], view_angle)))
+                return
+            
+            vectors = as_array(vectors)
             if labels is None:
                 labels = [f'v_{i+1}' for i in range(len(vectors))]
-            if colors is None:
-                colors = ['blue', 'red', 'green', 'orange', 'purple']
             
             # Listar vectores
             for i, (vec, label) in enumerate(zip(vectors, labels)):
@@ -133,35 +296,268 @@ class VectorSpace3D:
     
     def _generate_3d_plot(self, vectors, labels, colors, view_angle):
         """Genera código tikz-3dplot para gráfico 3D"""
-        max_val = max(max(abs(v[0]), abs(v[1]), abs(v[2])) for v in vectors) * 1.3
-        theta, phi = view_angle
+        bounds = SceneBounds.from_vectors(vectors, 3, margin=1.3)
+        max_val = bounds.limit
+        view = View3D(view_angle, self.project_3d)
+        origin = view.origin
         
-        code = r"\begin{center}" + "\n"
-        code += f"\\tdplotsetmaincoords{{{theta}}}{{{phi}}}\n"
-        code += r"\begin{tikzpicture}[tdplot_main_coords, scale=1.2]" + "\n"
+        tikz = TikZEmitter()
+        tikz.begin('center')
+        view.begin(tikz, f'scale={format_number(bounds.fit_scale(1.2))}')
         
         # Ejes coordenados
-        code += f"    \\draw[->] (0,0,0) -- ({max_val},0,0) node[right] {{$x$}};\n"
-        code += f"    \\draw[->] (0,0,0) -- (0,{max_val},0) node[above] {{$y$}};\n"
-        code += f"    \\draw[->] (0,0,0) -- (0,0,{max_val}) node[above] {{$z$}};\n"
+        x_end, y_end, z_end = view.points(np.eye(3) * max_val)
+        tikz.draw('->', f"{origin} -- {x_end} node[right] {{$x$}}")
+        tikz.draw('->', f"{origin} -- {y_end} node[above] {{$y$}}")
+        tikz.draw('->', f"{origin} -- {z_end} node[above] {{$z$}}")
         
         # Planos de referencia (opcional)
-        code += f"    \\draw[gray!20, fill=gray!5] (0,0,0) -- ({max_val*0.8},0,0) -- "
-        code += f"({max_val*0.8},{max_val*0.8},0) -- (0,{max_val*0.8},0) -- cycle;\n"
-        
-        # Dibujar vectores
-        for vec, label, color in zip(vectors, labels, colors):
-            code += f"    \\draw[->, ultra thick, {color}] (0,0,0) -- ({vec[0]},{vec[1]},{vec[2]}) "
-            code += f"node[above right] {{$\\vect{{{label}}}$}};\n"
-            code += f"    \\fill[{color}] ({vec[0]},{vec[1]},{vec[2]}) circle (2pt);\n"
+        side = max_val*0.8
+        corners = view.points([(side, 0, 0), (side, side, 0), (0, side, 0)])
+        tikz.draw('gray!20, fill=gray!5', f"{origin} -- {' -- '.join(corners)} -- cycle")
+        
+        points = bounds.coordinates(vectors)[:, :3]
+        colors = colormap(len(points), colors)
+        if len(points) > self.compact_threshold:
+            self._foreach_3d(tikz, view, points, labels, colors)
+            tikz.end('tikzpicture')
+            tikz.end('center')
+            return tikz.getvalue()
+        
+        # Dibujar vectores (coordenadas formateadas de una vez)
+        shadow_points = points * (1, 1, 0)
+        ends = view.points(points)
+        shadows = view.points(shadow_points)
+        styles = StyleRegistry.for_colors(colors)
+        layer = TikZEmitter()
+        for end, shadow, label, color in zip(ends, shadows, labels, colors):
+            layer.draw(styles(f'->, ultra thick, {color}'),
+                       f"{origin} -- {end} node[above right] {{$\\vect{{{label}}}$}}")
+            layer.fill(styles(color), f"{end} circle (2pt)")
             
             # Líneas proyección (ayuda visual)
-            code += f"    \\draw[dashed, {color}!40] ({vec[0]},{vec[1]},{vec[2]}) -- ({vec[0]},{vec[1]},0);\n"
+            layer.draw(styles(f'dashed, {color}!40'), f"{end} -- {shadow}")
+        
+        # De atrás hacia adelante: flecha (punto medio), extremo y proyección
+        order = None
+        if self.depth_sort:
+            n = len(layer) // 3
+            end_depth = view.depth(points[:n])
+            shadow_depth = view.depth(shadow_points[:n])
+            order = painter_order(np.column_stack(
+                [end_depth / 2, end_depth, (end_depth + shadow_depth) / 2]))
+        styles.emit(tikz)
+        tikz.extend(layer, order)
+        
+        tikz.end('tikzpicture')
+        tikz.end('center')
+        
+        return tikz.getvalue()
+    
+    def _foreach_3d(self, tikz, view, points, labels, colors):
+        """
+        Vectores 3D como lista de coordenadas/color/etiqueta y un único \\foreach
+        
+        Sin proyección en Python la sombra es (x, y, 0) y basta con x/y/z.
+        Con ``depth_sort`` se ordenan los vectores (no cada elemento) por la
+        profundidad del punto medio de la flecha.
+        """
+        n = min(len(points), len(labels), len(colors))
+        points = points[:n]
+        names = ColorRegistry.for_colors(colors[:n])
+        colors = [names(color) for color in colors[:n]]
+        names.emit(tikz)
+        if view.project:
+            coords = np.hstack([project(points, view.view_angle),
+                                project(points * (1, 1, 0), view.view_angle)])
+            variables = ['vx', 'vy', 'sx', 'sy']
+            end, shadow = r'(\vx,\vy)', r'(\sx,\sy)'
+        else:
+            coords = points
+            variables = ['vx', 'vy', 'vz']
+            end, shadow = r'(\vx,\vy,\vz)', r'(\vx,\vy,0)'
+        rows = format_rows(coords, sep='/')
+        entries = [f"{row}/{color}/{{{label}}}" for row, color, label in zip(rows, colors, labels)]
+        if self.depth_sort:
+            entries = [entries[i] for i in painter_order(view.depth(points)).tolist()]
+        tikz.foreach(variables + ['vc', 'vl'], entries, [
+            f'\\draw[->, ultra thick, \\vc] {view.origin} -- {end} '
+            f'node[above right] {{$\\vect{{\\vl}}$}};',
+            f'\\fill[\\vc] {end} circle (2pt);',
+            f'\\draw[dashed, \\vc!40] {end} -- {shadow};',
+        ])
+    
+    def _resolve_backend(self, backend, n_vectors):
+        """Backend de dibujo para n_vectores ('auto' decide por los umbrales)"""
+        if backend == 'auto':
+            if n_vectors > self.density_threshold:
+                return 'heatmap'
+            return 'pgfplots' if n_vectors > self.quiver_threshold else 'tikz'
+        if backend not in ('tikz', 'pgfplots', 'heatmap', 'rose'):
+            raise ValueError(f"Backend desconocido: {backend!r} "
+                             f"(use 'tikz', 'pgfplots', 'heatmap', 'rose' o 'auto')")
+        return backend
+    
+    def _add_table(self, columns, data):
+        """
+        Registra una tabla con las primeras len(columns) columnas de data y
+        devuelve su ruta relativa al .tex
+        
+        El nombre del archivo es el hash de su contenido, así que las cachés
+        de PDF y de figuras detectan cualquier cambio en los datos. Las filas
+        se formatean por bloques en un archivo temporal: la memoria no
+        depende del número de filas.
+        """
+        if self._staging is None:
+            self._staging = tempfile.mkdtemp(prefix='vectorspace3d-')
+            weakref.finalize(self, shutil.rmtree, self._staging, ignore_errors=True)
+        digest = hashlib.sha1()
+        fd, staged = tempfile.mkstemp(suffix='.dat', dir=self._staging)
+        with os.fdopen(fd, 'w', encoding='ascii') as f:
+            header = ' '.join(columns) + '\n'
+            f.write(header)
+            digest.update(header.encode('ascii'))
+            for block in iter_chunks(data):
+                rows = format_rows(block[:, :len(columns)])
+                text = '\n'.join(rows) + '\n' if rows else ''
+                f.write(text)
+                digest.update(text.encode('ascii'))
+        name = digest.hexdigest()[:16] + '.dat'
+        if name in self._tables:
+            os.remove(staged)
+        else:
+            self._tables[name] = staged
+        return f'{self.data_dir}/{name}'
+    
+    def _write_tables(self, filename):
+        """Copia las tablas de datos a la carpeta data_dir junto al .tex"""
+        if not self._tables:
+            return
+        directory = os.path.join(os.path.dirname(os.path.abspath(filename)), self.data_dir)
+        os.makedirs(directory, exist_ok=True)
+        for name, staged in self._tables.items():
+            path = os.path.join(directory, name)
+            if not os.path.exists(path):
+                shutil.copyfile(staged, path)
+    
+    def _generate_2d_quiver(self, vectors, color, show_grid):
+        """Genera un quiver de pgfplots con los vectores en una tabla externa"""
+        lim = format_number(max_abs(vectors, 2) * 1.2 or 1.0)
+        table = self._add_table(('u', 'v'), vectors)
         
-        code += r"\end{tikzpicture}" + "\n"
-        code += r"\end{center}" + "\n"
+        options = (f"axis lines=middle, axis equal, xlabel=$x$, ylabel=$y$, "
+                   f"xmin=-{lim}, xmax={lim}, ymin=-{lim}, ymax={lim}")
+        if show_grid:
+            options += ", grid=major"
+        
+        tikz = TikZEmitter()
+        tikz.begin('center')
+        tikz.begin('tikzpicture')
+        tikz.begin('axis', options)
+        tikz.addplot(f"-stealth, {color}, quiver={{u=\\thisrow{{u}}, v=\\thisrow{{v}}}}",
+                     f"table[x expr=0, y expr=0] {{{table}}}")
+        tikz.end('axis')
+        tikz.end('tikzpicture')
+        tikz.end('center')
+        return tikz.getvalue()
+    
+    def _generate_3d_quiver(self, vectors, color, view_angle):
+        """Genera un quiver 3D de pgfplots con los vectores en una tabla externa"""
+        lim = format_number(max_abs(vectors, 3) * 1.3 or 1.0)
+        table = self._add_table(('u', 'v', 'w'), vectors)
+        theta, phi = view_angle
+        
+        # Misma orientación que \tdplotsetmaincoords{theta}{phi}
+        options = (f"view={{{phi - 90}}}{{{90 - theta}}}, axis lines=center, "
+                   f"xlabel=$x$, ylabel=$y$, zlabel=$z$, "
+                   f"xmin=-{lim}, xmax={lim}, ymin=-{lim}, ymax={lim}, zmin=-{lim}, zmax={lim}")
         
-        return code
+        tikz = TikZEmitter()
+        tikz.begin('center')
+        tikz.begin('tikzpicture')
+        tikz.begin('axis', options)
+        tikz.addplot(f"-stealth, {color}, quiver={{u=\\thisrow{{u}}, v=\\thisrow{{v}}, "
+                     f"w=\\thisrow{{w}}}}",
+                     f"table[x expr=0, y expr=0, z expr=0] {{{table}}}", three_d=True)
+        tikz.end('axis')
+        tikz.end('tikzpicture')
+        tikz.end('center')
+        return tikz.getvalue()
+    
+    def _add_density(self, vectors, mode, color, bins, sample):
+        """Añade un heatmap de extremos o una rosa de direcciones (tamaño fijo)"""
+        data = as_rows(vectors)
+        overlay = sample_rows(data, sample)[:, :2]
+        if mode == 'heatmap':
+            bins = bins or 64
+            counts, x_edges, y_edges = endpoint_histogram(data, bins)
+            self.doc.append(f"Densidad de los extremos de {len(data)} vectores "
+                            f"({bins}×{bins} celdas).\n\n")
+            code = self._generate_heatmap(counts, x_edges, y_edges, overlay, color)
+        else:
+            bins = bins or 36
+            counts, edges = direction_histogram(data, bins)
+            self.doc.append(f"Distribución de direcciones de {len(data)} vectores "
+                            f"({bins} sectores).\n\n")
+            code = self._generate_rose(counts, edges, overlay, color)
+        self.doc.append(NoEscape(code))
+    
+    def _generate_heatmap(self, counts, x_edges, y_edges, overlay, color):
+        """Mapa de densidad con pgfplots (matrix plot) y flechas de muestra"""
+        x_centers = (x_edges[:-1] + x_edges[1:]) / 2
+        y_centers = (y_edges[:-1] + y_edges[1:]) / 2
+        grid_x, grid_y = np.meshgrid(x_centers, y_centers)  # x varía más rápido
+        cells = np.column_stack([grid_x.ravel(), grid_y.ravel(), counts.T.ravel()])
+        table = self._add_table(('x', 'y', 'c'), cells)
+        xmin, xmax, ymin, ymax = format_numbers([x_edges[0], x_edges[-1], y_edges[0], y_edges[-1]])
+        
+        tikz = TikZEmitter()
+        tikz.begin('center')
+        tikz.begin('tikzpicture')
+        tikz.begin('axis', f"xlabel=$x$, ylabel=$y$, xmin={xmin}, xmax={xmax}, "
+                           f"ymin={ymin}, ymax={ymax}, enlargelimits=false, axis on top, "
+                           f"colorbar, colormap/viridis, point meta min=0")
+        tikz.addplot(f"matrix plot*, mesh/cols={len(x_centers)}, point meta=explicit",
+                     f"table[meta=c] {{{table}}}")
+        if len(overlay):
+            sample_table = self._add_table(('u', 'v'), overlay)
+            tikz.addplot(f"-stealth, {color}, quiver={{u=\\thisrow{{u}}, v=\\thisrow{{v}}}}",
+                         f"table[x expr=0, y expr=0] {{{sample_table}}}")
+        tikz.end('axis')
+        tikz.end('tikzpicture')
+        tikz.end('center')
+        return tikz.getvalue()
+    
+    def _generate_rose(self, counts, edges, overlay, color):
+        """Rosa de direcciones: un sector por intervalo, de área proporcional al conteo"""
+        radius = np.sqrt(counts / max(counts.max(), 1))
+        degrees = np.degrees(edges)
+        
+        tikz = TikZEmitter()
+        tikz.begin('center')
+        tikz.begin('tikzpicture', 'scale=2')
+        tikz.draw('gray!30', "(0,0) circle (1)")
+        tikz.draw('->, gray', "(-1.2,0) -- (1.2,0) node[right] {$x$}")
+        tikz.draw('->, gray', "(0,-1.2) -- (0,1.2) node[above] {$y$}")
+        
+        # Sectores (solo los intervalos con vectores)
+        filled = counts > 0
+        sectors = format_rows(np.column_stack([degrees[:-1], radius, degrees[1:]])[filled])
+        for sector in sectors:
+            start, r, end = sector.split()
+            tikz.fill(f'{color}!50, draw={color}',
+                      f"(0,0) -- ({start}:{r}) arc[start angle={start}, end angle={end}, "
+                      f"radius={r}] -- cycle")
+        
+        # Muestra de vectores reales, escalados al círculo unidad
+        if len(overlay):
+            scale = np.linalg.norm(overlay, axis=1).max() or 1.0
+            for end in format_points(overlay / scale):
+                tikz.draw('->, thin, black', f"(0,0) -- {end}")
+        
+        tikz.end('tikzpicture')
+        tikz.end('center')
+        return tikz.getvalue()
     
     def add_vector_operations(self, v1, v2, label1='u', label2='v'):
         """Añade sección con operaciones vectoriales"""
@@ -232,33 +628,45 @@ class VectorSpace3D:
             
             if len(vectors[0]) == 2:
                 # Gráfico comparativo 2D
-                code = r"\begin{center}" + "\n"
-                code += r"\begin{tikzpicture}[scale=1.5]" + "\n"
+                tikz = TikZEmitter()
+                tikz.begin('center')
+                tikz.begin('tikzpicture', 'scale=1.5')
                 
                 # Vectores originales
-                for i, v in enumerate(vectors):
+                for i, end in enumerate(format_points(np.asarray(vectors, dtype=float))):
                     color = ['blue', 'red'][i]
-                    code += f"    \\draw[->, thick, {color}!60] (0,0) -- ({v[0]},{v[1]});\n"
+                    tikz.draw(f'->, thick, {color}!60', f"(0,0) -- {end}")
                 
                 # Vectores transformados
-                for i, v in enumerate(transformed):
+                for i, end in enumerate(format_points(np.asarray(transformed, dtype=float))):
                     color = ['blue', 'red'][i]
-                    code += f"    \\draw[->, ultra thick, {color}] (0,0) -- ({v[0]},{v[1]});\n"
+                    tikz.draw(f'->, ultra thick, {color}', f"(0,0) -- {end}")
                 
-                code += r"\end{tikzpicture}" + "\n"
-                code += r"\end{center}" + "\n"
-                self.doc.append(NoEscape(code))
+                tikz.end('tikzpicture')
+                tikz.end('center')
+                self.doc.append(NoEscape(tikz.getvalue()))
     
-    def generate(self, filename='vectorspace3d_output', compile_pdf=True):
-        """Genera el documento LaTeX"""
-        self.doc.generate_tex(filename)
-        if compile_pdf:
-            try:
-                self.doc.generate_pdf(filename, clean_tex=False)
-                print(f"✓ Documento generado: {filename}.pdf")
-            except Exception as e:
-                print(f"⚠ PDF no generado (requiere LaTeX instalado): {e}")
-                print(f"✓ Archivo .tex generado: {filename}.tex")
+    def generate(self, filename='vectorspace3d_output', compile_pdf=True, cache=None,
+                 externalize=False, parallel=False, formats=False):
+        """
+        Genera el documento LaTeX
+        
+        Las opciones de compilación son las de ``latex_build.build_document``.
+        """
+        self._write_tables(filename)
+        if not compile_pdf:
+            if self.stream:
+                self.doc.generate_tex(filename)
+            else:
+                write_tex(self.doc.dumps(), filename)
+            return
+        
+        try:
+            build_document(self.doc, filename, cache=cache, externalize=externalize,
+                           parallel=parallel, formats=formats)
+        except Exception as e:
+            print(f"⚠ PDF no generado (requiere LaTeX instalado): {e}")
+            print(f"✓ Archivo .tex generado: {filename}.tex")
 
 
 # Ejemplo de uso
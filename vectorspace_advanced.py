@@ -6,36 +6,72 @@ from vectorspace3d_main import VectorSpace3D
 import numpy as np
 from pylatex import Section, Subsection, Math, NoEscape
 
+from tikz_emitter import MAX_SHOWN_COMPONENTS, format_rows, format_tuple
+from vector_io import iter_chunks
+from vector_linalg import Projector, RankAnalysis, eigenpairs, orthonormalize, projector
+
 class AdvancedVectorSpace(VectorSpace3D):
     """Extensión con funcionalidades avanzadas"""
     
-    def add_vector_space_basis(self, basis_vectors, title="Base del Espacio Vectorial"):
-        """Analiza y visualiza una base de vectores"""
+    def add_vector_space_basis(self, basis_vectors, title="Base del Espacio Vectorial",
+                               max_rows=20):
+        """
+        Analiza y visualiza una base de vectores
+        
+        La independencia se decide con el rango de la SVD
+        (``vector_linalg.RankAnalysis``), para cualquier número de vectores
+        y dimensión. Se muestran a lo sumo ``max_rows`` vectores, abreviados
+        si tienen muchas componentes.
+        """
+        analysis = RankAnalysis(basis_vectors)
+        dim, n = analysis.shape
         with self.doc.create(Section(title)):
-            dim = len(basis_vectors)
-            n = len(basis_vectors[0])
-            
             self.doc.append(f"Base del espacio vectorial ")
-            self.doc.append(Math(data=[f'\\mathbb{{R}}^{n}']))
+            self.doc.append(Math(data=[NoEscape(f'\\mathbb{{R}}^{{{n}}}')]))
             self.doc.append(f" con dimensión {dim}:\n\n")
             
             # Mostrar vectores base
-            for i, vec in enumerate(basis_vectors):
-                vec_str = '(' + ', '.join(str(x) for x in vec) + ')'
-                self.doc.append(Math(data=[f'\\vect{{e_{i+1}}} = {vec_str}']))
+            for i, vec in enumerate(basis_vectors[:max_rows]):
+                self.doc.append(Math(data=[NoEscape(f'\\vect{{e_{i+1}}} = {format_tuple(vec)}')]))
                 self.doc.append('\n\n')
+            if dim > max_rows:
+                self.doc.append(f"(primeros {max_rows} de {dim} vectores)\n\n")
             
-            # Verificar independencia lineal (determinante)
-            if dim == n:
+            # Determinante, solo como referencia en dimensión baja
+            if dim == n <= 3:
                 det = np.linalg.det(basis_vectors)
                 self.doc.append(f"Determinante de la matriz formada por los vectores: ")
-                self.doc.append(Math(data=[f'\\det(A) = {det:.4f}']))
+                self.doc.append(Math(data=[NoEscape(f'\\det(A) = {det:.4f}')]))
                 self.doc.append('\n\n')
-                
-                if abs(det) > 1e-10:
-                    self.doc.append("✓ Los vectores son linealmente independientes y forman una base.\n\n")
-                else:
-                    self.doc.append("✗ Los vectores son linealmente dependientes.\n\n")
+            
+            # Rango y condición
+            sigma = analysis.singular_values
+            self.doc.append("Valores singulares: ")
+            self.doc.append(Math(data=[NoEscape(f'\\sigma = {format_tuple(sigma)}')]))
+            self.doc.append('\n\n')
+            condition = analysis.condition
+            kappa = '\\infty' if np.isinf(condition) else f'{condition:.4g}'
+            self.doc.append(f"Rango: {analysis.rank}. Número de condición: ")
+            self.doc.append(Math(data=[NoEscape(f'\\kappa(A) = {kappa}')], inline=True))
+            self.doc.append('.\n\n')
+            
+            # Verificar independencia lineal
+            if analysis.independent and analysis.spans:
+                self.doc.append("✓ Los vectores son linealmente independientes y forman una base.\n\n")
+            elif analysis.independent:
+                self.doc.append(f"✓ Los vectores son linealmente independientes y generan un "
+                                f"subespacio de dimensión {analysis.rank}.\n\n")
+            else:
+                self.doc.append("✗ Los vectores son linealmente dependientes. Relaciones "
+                                "de dependencia (coeficientes c con ")
+                self.doc.append(Math(data=[NoEscape(r'\sum_i c_i \vect{e_i} = \vect{0}')],
+                                     inline=True))
+                self.doc.append("):\n\n")
+                for i, c in enumerate(analysis.null_space(max_rows)):
+                    self.doc.append(Math(data=[NoEscape(f'\\vect{{c_{{{i+1}}}}} = {format_tuple(c)}')]))
+                    self.doc.append('\n\n')
+                if analysis.nullity > max_rows:
+                    self.doc.append(f"(primeras {max_rows} de {analysis.nullity} relaciones)\n\n")
             
             # Visualización
             if n == 2:
@@ -47,45 +83,67 @@ class AdvancedVectorSpace(VectorSpace3D):
                                   labels=[f'e_{i+1}' for i in range(dim)],
                                   title="")
     
-    def add_gram_schmidt(self, vectors, title="Proceso de Gram-Schmidt"):
-        """Ortogonalización de Gram-Schmidt"""
+    def add_gram_schmidt(self, vectors, title="Proceso de Gram-Schmidt", steps=True,
+                         max_rows=20):
+        """
+        Ortogonalización de Gram-Schmidt
+        
+        La base se calcula de una vez con ``vector_linalg.orthonormalize``
+        (QR, o Gram-Schmidt modificado si hay vectores dependientes, que se
+        descartan). Con ``steps=False`` no se escribe una subsección por vector;
+        con ``steps=True``, solo para los primeros ``max_rows`` vectores.
+        """
         with self.doc.create(Section(title)):
             self.doc.append("Proceso de ortogonalización de Gram-Schmidt:\n\n")
             
-            # Implementar Gram-Schmidt
-            orthogonal = []
-            for i, v in enumerate(vectors):
-                v_array = np.array(v)
-                # Restar proyecciones sobre vectores anteriores
-                u = v_array.copy()
-                for o in orthogonal:
-                    o_array = np.array(o)
-                    proj = (np.dot(v_array, o_array) / np.dot(o_array, o_array)) * o_array
-                    u = u - proj
-                
-                # Normalizar
-                u_norm = u / np.linalg.norm(u)
-                orthogonal.append(tuple(u_norm))
-                
-                # Mostrar paso
-                with self.doc.create(Subsection(f"Vector ortogonal {i+1}")):
-                    vec_str = '(' + ', '.join(f'{x:.4f}' for x in u_norm) + ')'
-                    self.doc.append(Math(data=[f'\\vect{{u_{i+1}}} = {vec_str}']))
-                    self.doc.append('\n\n')
+            orthogonal, kept = orthonormalize(vectors)
+            
+            # Mostrar pasos
+            if steps:
+                u_index = dict(zip(kept.tolist(), range(len(kept))))
+                for i in range(min(len(vectors), max_rows)):
+                    with self.doc.create(Subsection(f"Vector ortogonal {i+1}")):
+                        if i not in u_index:
+                            self.doc.append(f"El vector {i+1} es combinación lineal de los "
+                                            f"anteriores y se descarta.\n\n")
+                            continue
+                        k = u_index[i]
+                        vec_str = format_tuple(orthogonal[k])
+                        self.doc.append(Math(data=[NoEscape(f'\\vect{{u_{k+1}}} = {vec_str}')]))
+                        self.doc.append('\n\n')
+                if len(vectors) > max_rows:
+                    self.doc.append(f"(primeros {max_rows} de {len(vectors)} vectores)\n\n")
+            
+            if len(kept) < len(vectors):
+                self.doc.append(f"Rango: {len(kept)} de {len(vectors)} vectores.\n\n")
             
             # Visualizar conjunto ortogonal
-            if len(vectors[0]) == 2:
-                self.add_vector_2d(orthogonal,
-                                  labels=[f'u_{i+1}' for i in range(len(orthogonal))],
-                                  title="Base Ortonormal Resultante")
-            elif len(vectors[0]) == 3:
-                self.add_vector_3d(orthogonal,
-                                  labels=[f'u_{i+1}' for i in range(len(orthogonal))],
-                                  title="Base Ortonormal Resultante")
+            labels = [f'u_{i+1}' for i in range(len(orthogonal))]
+            if orthogonal.shape[1] == 2:
+                self.add_vector_2d(orthogonal, labels=labels, title="Base Ortonormal Resultante")
+            elif orthogonal.shape[1] == 3:
+                self.add_vector_3d(orthogonal, labels=labels, title="Base Ortonormal Resultante")
     
     def add_subspace_projection(self, vector, subspace_basis, 
-                               title="Proyección sobre Subespacio"):
-        """Proyecta un vector sobre un subespacio"""
+                               title="Proyección sobre Subespacio", max_rows=20):
+        """
+        Proyecta un vector (o un lote de vectores) sobre un subespacio
+        
+        La base no tiene que ser ortogonal: se factoriza una sola vez con
+        ``vector_linalg.projector``, que la guarda en caché. Con un lote
+        (arreglo (N, d), memmap o CSVVectors) se escribe una tabla resumen
+        con las primeras ``max_rows`` filas y las estadísticas del lote.
+        ``subspace_basis`` puede ser también un ``Projector`` o una
+        ``IncrementalBasis`` ya construidos.
+        """
+        if isinstance(subspace_basis, Projector):
+            proj = subspace_basis
+        else:
+            proj = projector(subspace_basis)
+        if hasattr(vector, 'chunks') or np.ndim(vector) == 2:
+            self._add_batch_projection(vector, proj, title, max_rows)
+            return
+        
         with self.doc.create(Section(title)):
             self.doc.append(f"Vector a proyectar: ")
             vec_str = '(' + ', '.join(str(x) for x in vector) + ')'
@@ -93,13 +151,8 @@ class AdvancedVectorSpace(VectorSpace3D):
             self.doc.append('\n\n')
             
             # Calcular proyección
-            v = np.array(vector)
-            projection = np.zeros_like(v)
-            
-            for basis_vec in subspace_basis:
-                b = np.array(basis_vec)
-                proj = (np.dot(v, b) / np.dot(b, b)) * b
-                projection += proj
+            v = np.asarray(vector, dtype=float)
+            projection = proj.project(v)
             
             proj_str = '(' + ', '.join(f'{x:.4f}' for x in projection) + ')'
             self.doc.append("Proyección sobre el subespacio:\n\n")
@@ -127,52 +180,139 @@ class AdvancedVectorSpace(VectorSpace3D):
                 tikz_code = self._generate_3d_plot(vectors, labels, colors, (70, 120))
                 self.doc.append(NoEscape(tikz_code))
     
-    def add_eigenanalysis(self, matrix, title="Análisis de Valores y Vectores Propios"):
-        """Calcula y visualiza valores y vectores propios"""
+    def _add_batch_projection(self, vectors, proj, title, max_rows):
+        """Tabla resumen de la proyección de un lote, recorrido por bloques"""
+        count = 0
+        total = np.zeros(3)
+        worst = 0.0
+        inside = 0
+        shown = []
+        for block in iter_chunks(vectors):
+            residual = proj.residual(block)
+            norms = np.column_stack([np.linalg.norm(block, axis=1),
+                                     np.linalg.norm(block - residual, axis=1),
+                                     np.linalg.norm(residual, axis=1)])
+            if count < max_rows:
+                shown.append(norms[:max_rows - count])
+            relative = norms[:, 2] / np.where(norms[:, 0] > 0, norms[:, 0], 1.0)
+            total += norms.sum(axis=0)
+            worst = max(worst, float(relative.max(initial=0.0)))
+            inside += int(np.count_nonzero(relative <= proj.tol))
+            count += len(block)
+        
         with self.doc.create(Section(title)):
-            self.doc.append("Matriz a analizar:\n\n")
-            
-            # Mostrar matriz
-            mat_str = r'\begin{bmatrix} '
-            for i, row in enumerate(matrix):
-                mat_str += ' & '.join(f'{x:.2f}' for x in row)
-                if i < len(matrix) - 1:
-                    mat_str += r' \\ '
-            mat_str += r' \end{bmatrix}'
-            self.doc.append(Math(data=[f'A = {mat_str}']))
+            self.doc.append(f"Proyección de {count} vectores de ")
+            self.doc.append(Math(data=[NoEscape(f'\\mathbb{{R}}^{{{proj.dim}}}')], inline=True))
+            self.doc.append(f" sobre un subespacio de dimensión {proj.rank}.\n\n")
+            if not count:
+                return
+            
+            shown = np.concatenate(shown)
+            rows = format_rows(np.column_stack([np.arange(1, len(shown) + 1), shown]),
+                               sep=' & ', close=r' \\')
+            header = (r'$i$ & $\|\vect{v}\|$ & $\|\text{proj}_W(\vect{v})\|$ & '
+                      r'$\|\vect{v}^\perp\|$ \\ \hline')
+            table = [r'\begin{center}', r'\begin{tabular}{rrrr}', header, *rows,
+                     r'\end{tabular}', r'\end{center}']
+            self.doc.append(NoEscape('\n'.join(table) + '\n'))
+            if count > len(shown):
+                self.doc.append(f"(primeras {len(shown)} de {count} filas)\n\n")
+            
+            mean_v, mean_proj, mean_perp = total / count
+            self.doc.append("Normas medias:\n\n")
+            self.doc.append(Math(data=[NoEscape(
+                f'\\overline{{\\|\\vect{{v}}\\|}} = {mean_v:.4f}, \\quad '
+                f'\\overline{{\\|\\text{{proj}}_W(\\vect{{v}})\\|}} = {mean_proj:.4f}, \\quad '
+                f'\\overline{{\\|\\vect{{v}}^\\perp\\|}} = {mean_perp:.4f}')]))
             self.doc.append('\n\n')
+            self.doc.append(f"Máximo residuo relativo: {worst:.4g}. "
+                            f"Vectores contenidos en el subespacio: {inside} de {count}.\n\n")
+    
+    def add_incremental_basis(self, basis, title="Base Incremental", max_rows=20):
+        """
+        Muestra el estado actual de una ``IncrementalBasis``
+        
+        Se usa la base ya ortonormalizada, sin recalcular nada. Se muestran a
+        lo sumo ``max_rows`` vectores, abreviados si tienen muchas componentes.
+        """
+        with self.doc.create(Section(title)):
+            self.doc.append(f"Base ortonormal construida a partir de {basis.count} vectores de ")
+            self.doc.append(Math(data=[NoEscape(f'\\mathbb{{R}}^{{{basis.dim}}}')], inline=True))
+            self.doc.append(f": dimensión {basis.rank}")
+            discarded = basis.count - basis.rank
+            if discarded:
+                self.doc.append(f" (descartados por dependientes: {discarded})")
+            self.doc.append(".\n\n")
             
-            # Calcular eigenvalores y eigenvectores
-            eigenvalues, eigenvectors = np.linalg.eig(matrix)
+            for i, u in enumerate(basis.basis[:max_rows]):
+                self.doc.append(Math(data=[NoEscape(f'\\vect{{u_{i+1}}} = {format_tuple(u)}')]))
+                self.doc.append('\n\n')
+            if basis.rank > max_rows:
+                self.doc.append(f"(primeros {max_rows} de {basis.rank} vectores)\n\n")
+            
+            labels = [f'u_{i+1}' for i in range(basis.rank)]
+            if basis.rank and basis.dim == 2:
+                self.add_vector_2d(basis.basis, labels=labels, title="")
+            elif basis.rank and basis.dim == 3:
+                self.add_vector_3d(basis.basis, labels=labels, title="")
+    
+    def add_eigenanalysis(self, matrix, title="Análisis de Valores y Vectores Propios", k=None):
+        """
+        Calcula y visualiza valores y vectores propios
+        
+        Las matrices simétricas se resuelven con ``eigh`` y, si solo se
+        piden los ``k`` pares dominantes (mayor valor absoluto) de una
+        matriz grande, con iteración de subespacios
+        (``vector_linalg.eigenpairs``). Solo se escriben los pares pedidos.
+        """
+        matrix = np.asarray(matrix)
+        n = matrix.shape[0]
+        eigenvalues, eigenvectors, symmetric = eigenpairs(matrix, k)
+        with self.doc.create(Section(title)):
+            # Mostrar matriz (las grandes solo se describen)
+            if n <= MAX_SHOWN_COMPONENTS:
+                self.doc.append("Matriz a analizar:\n\n")
+                rows = r' \\ '.join(' & '.join(f'{x:.2f}' for x in row) for row in matrix)
+                self.doc.append(Math(data=[NoEscape(f'A = \\begin{{bmatrix}} {rows} \\end{{bmatrix}}')]))
+                self.doc.append('\n\n')
+            else:
+                self.doc.append(f"Matriz a analizar de {n}×{n}.\n\n")
+            if symmetric:
+                self.doc.append("La matriz es simétrica: los valores propios son reales y "
+                                "los vectores propios, ortonormales.\n\n")
+            if len(eigenvalues) < n:
+                self.doc.append(f"Se muestran los {len(eigenvalues)} valores propios de mayor "
+                                f"valor absoluto.\n\n")
             
             with self.doc.create(Subsection("Valores Propios")):
                 for i, eigenval in enumerate(eigenvalues):
                     if np.isreal(eigenval):
-                        self.doc.append(Math(data=[f'\\lambda_{i+1} = {eigenval.real:.4f}']))
+                        value = f'{eigenval.real:.4f}'
                     else:
-                        self.doc.append(Math(data=[f'\\lambda_{i+1} = {eigenval.real:.4f} + {eigenval.imag:.4f}i']))
+                        sign = '+' if eigenval.imag >= 0 else '-'
+                        value = f'{eigenval.real:.4f} {sign} {abs(eigenval.imag):.4f}i'
+                    self.doc.append(Math(data=[NoEscape(f'\\lambda_{{{i+1}}} = {value}')]))
                     self.doc.append('\n\n')
             
             with self.doc.create(Subsection("Vectores Propios")):
                 vectors_list = []
                 for i, eigenvec in enumerate(eigenvectors.T):
                     if np.all(np.isreal(eigenvec)):
-                        vec_str = '(' + ', '.join(f'{x.real:.4f}' for x in eigenvec) + ')'
-                        self.doc.append(Math(data=[f'\\vect{{v_{i+1}}} = {vec_str}']))
+                        vec_str = format_tuple(eigenvec.real)
+                        self.doc.append(Math(data=[NoEscape(f'\\vect{{v_{{{i+1}}}}} = {vec_str}')]))
                         self.doc.append('\n\n')
                         vectors_list.append(tuple(eigenvec.real))
                 
                 # Visualizar vectores propios
-                if len(matrix) == 2 and len(vectors_list) == 2:
+                if n == 2 and len(vectors_list) == 2:
                     self.add_vector_2d(vectors_list,
                                       labels=[f'v_{i+1}' for i in range(len(vectors_list))],
                                       title="Visualización de Vectores Propios")
-                elif len(matrix) == 3 and len(vectors_list) == 3:
+                elif n == 3 and len(vectors_list) == 3:
                     self.add_vector_3d(vectors_list,
                                       labels=[f'v_{i+1}' for i in range(len(vectors_list))],
                                       title="Visualización de Vectores Propios")
 
-
 # Ejemplo completo de uso
 if __name__ == "__main__":
     # Crear sistema avanzado
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Proyección ortográfica de tikz-3dplot calculada en Python
+
+``\\tdplotsetmaincoords{theta}{phi}`` define el estilo ``tdplot_main_coords``
+con los vectores unitarios de los ejes en pantalla, y TeX proyecta cada
+coordenada (x, y, z) con su aritmética de punto fijo al compilar. ``View3D``
+hace la misma proyección con una sola multiplicación de matrices de NumPy y
+escribe coordenadas 2D: la figura es la misma y TeX no tiene que calcular
+nada. Con ``project=False`` escribe las coordenadas 3D y la cabecera de
+tikz-3dplot, como antes.
+
+TikZ pinta en el orden en que recibe los comandos. ``painter_order``
+ordena los elementos de una escena por profundidad (algoritmo del pintor)
+para que las flechas lejanas no tapen a las cercanas.
+"""
+
+import numpy as np
+
+from tikz_emitter import format_points
+
+
+def main_coords(theta, phi):
+    """
+    Matriz 3x3 de la vista de ``\\tdplotsetmaincoords{theta}{phi}`` (grados)
+
+    Las filas son la x y la y de pantalla y la profundidad (positiva hacia
+    el observador); las columnas, los ejes x, y, z.
+    """
+    theta, phi = np.radians(theta), np.radians(phi)
+    st, ct, sp, cp = np.sin(theta), np.cos(theta), np.sin(phi), np.cos(phi)
+    return np.array([[cp, sp, 0.0],
+                     [-ct * sp, ct * cp, st],
+                     [st * sp, -st * cp, ct]])
+
+
+def project(points, view_angle):
+    """Coordenadas de pantalla (N, 2) de los puntos (N, 3)"""
+    points = np.asarray(points, dtype=float)
+    return points @ main_coords(*view_angle)[:2].T
+
+
+def depth(points, view_angle):
+    """Profundidad (N,) de los puntos (N, 3); mayor es más cerca"""
+    points = np.asarray(points, dtype=float)
+    return points @ main_coords(*view_angle)[2]
+
+
+class View3D:
+    """Escribe coordenadas 3D proyectadas (o en 3D para tikz-3dplot)"""
+
+    def __init__(self, view_angle, project=True):
+        """
+        Args:
+            view_angle: (theta, phi) en grados, como en \\tdplotsetmaincoords
+            project: Si es True se proyecta en Python y se escribe en 2D
+        """
+        self.view_angle = tuple(view_angle)
+        self.project = project
+        self.origin = '(0,0)' if project else '(0,0,0)'
+
+    def points(self, points):
+        """Lista de coordenadas TikZ, una por fila de ``points`` (N, 3)"""
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        if self.project:
+            points = project(points, self.view_angle)
+        return format_points(points)
+
+    def depth(self, points):
+        """Profundidad (N,) de los puntos (N, 3) en esta vista"""
+        return depth(np.asarray(points, dtype=float).reshape(-1, 3), self.view_angle)
+
+    def point(self, *values):
+        """Coordenada TikZ de un único punto"""
+        return self.points([values])[0]
+
+    def header(self, options=None):
+        """
+        Líneas de inicio de la figura
+
+        Sin proyección: ``\\tdplotsetmaincoords`` y ``tdplot_main_coords``.
+        """
+        if self.project:
+            return [f'\\begin{{tikzpicture}}[{options}]' if options else '\\begin{tikzpicture}']
+        theta, phi = self.view_angle
+        options = f'tdplot_main_coords, {options}' if options else 'tdplot_main_coords'
+        return [f'\\tdplotsetmaincoords{{{theta}}}{{{phi}}}',
+                f'\\begin{{tikzpicture}}[{options}]']
+
+    def begin(self, tikz, options=None):
+        """Abre la figura en un TikZEmitter"""
+        tikz.lines(self.header(options))
+
+
+def painter_order(depths):
+    """
+    Orden de pintado del más lejano al más cercano (algoritmo del pintor)
+
+    Un único ``argsort`` estable, O(N log N): con igual profundidad se
+    conserva el orden original, así que los elementos de un mismo vector
+    siguen pintándose en el orden en que se generaron.
+    """
+    return np.argsort(np.asarray(depths, dtype=float).ravel(), kind='stable')